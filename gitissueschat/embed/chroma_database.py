@@ -15,7 +15,7 @@ import chromadb
 from chromadb.utils import embedding_functions
 from tqdm import tqdm
 
-from gitissueschat.embed.google_vertex_embedding_function import GoogleVertexEmbeddingFunctionCustom
+from gitissueschat.embed.google_vertex_embedding_function import get_embedding_function
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -64,7 +64,7 @@ class ChunksDatabase:
             # Always use GoogleVertexEmbeddingFunctionCustom if project_id is available
             if project_id:
                 logger.info(f"Using GoogleVertexEmbeddingFunctionCustom with project_id: {project_id}")
-                self.embedding_function = GoogleVertexEmbeddingFunctionCustom(
+                self.embedding_function = get_embedding_function(
                     project_id=project_id,
                     credentials_path=credentials_path
                 )
@@ -90,12 +90,18 @@ class ChunksDatabase:
         """
         return self.collection
     
-    def add_chunks(self, chunks: List[Dict[str, Any]]) -> None:
+    def add_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        embeddings: Optional[List[List[float]]] = None
+    ) -> None:
         """
         Add chunks to the database.
         
         Args:
             chunks: List of chunks to add.
+            embeddings: Optional precomputed embeddings, one per chunk. If None, the
+                collection's embedding function is used to embed the chunk texts.
         """
         if not chunks:
             logger.warning("No chunks to add")
@@ -159,6 +165,7 @@ class ChunksDatabase:
         try:
             self.collection.add(
                 ids=ids,
+                embeddings=embeddings,
                 documents=documents,
                 metadatas=metadatas
             )
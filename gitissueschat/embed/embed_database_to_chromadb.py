@@ -6,11 +6,17 @@ and embeds the chunks into ChromaDB in batches.
 """
 
 import argparse
+import asyncio
 import json
 import logging
+import multiprocessing
 import os
 import sqlite3
 import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Tuple
 
 from tqdm import tqdm
@@ -23,6 +29,11 @@ from gitissueschat.utils.db_path_manager import get_sqlite_db_path, get_chroma_d
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Default cap on chunking processes; each one imports the chunker and its dependencies
+_MAX_DEFAULT_CHUNK_WORKERS = 4
+# Fewer pending issues than this are chunked in the calling thread, without a process pool
+_MIN_ISSUES_FOR_CHUNK_POOL = 50
+
 
 def get_repositories(db_path: str) -> List[Dict[str, Any]]:
     """
@@ -144,6 +155,121 @@ def process_issue_with_comments(
     return chunks
 
 
+@lru_cache(maxsize=None)
+def _get_chunker(chunk_size: int, chunk_overlap: int) -> LlamaIndexChunker:
+    # One chunker per worker process, reused for every issue it chunks
+    return LlamaIndexChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def chunk_issue_for_embedding(
+    repo_name: str,
+    issue: Dict[str, Any],
+    comments: List[Dict[str, Any]],
+    chunk_size: int,
+    chunk_overlap: int
+) -> List[Dict[str, Any]]:
+    """
+    Chunk an issue and its comments into chunk objects ready for embedding.
+    
+    This runs in worker processes, so it takes plain dictionaries and builds its own chunker.
+    
+    Args:
+        repo_name: Repository name.
+        issue: Issue data.
+        comments: Comments for the issue, ordered by creation time.
+        chunk_size: Size of chunks in tokens.
+        chunk_overlap: Overlap between chunks in tokens.
+        
+    Returns:
+        List of chunks.
+    """
+    chunker = _get_chunker(chunk_size, chunk_overlap)
+    issue_id = issue["id"]
+    issue_number = issue["number"]
+    issue_doc_id = f"issue-{repo_name}-{issue_number}"
+    chunks = []
+    
+    # Format issue text with clear structure and add updated timestamp at the end
+    issue_text = f"## Issue #{issue_number}: {issue['title']}\n\nCreated by {issue['author']} on {issue['created_at']}\n\n{issue['body']}\n\nLast updated: {issue['updated_at']}"
+    
+    # Get the first 100 characters of the issue body for context in comments
+    issue_context = issue['body'][:100] + "..." if issue['body'] and len(issue['body']) > 100 else issue['body'] or ""
+    
+    # Chunk the issue text
+    issue_chunks = chunker._split_text_into_chunks(issue_text)
+    
+    # Create metadata for each issue chunk
+    for i, chunk in enumerate(issue_chunks):
+        chunk_id = f"{issue_doc_id}-issue-chunk-{i}"
+        metadata = {
+            "repo_name": repo_name,
+            "issue_number": issue_number,
+            "issue_title": issue["title"],
+            "issue_state": issue["state"],
+            "issue_author": issue["author"],
+            "issue_url": issue["html_url"],
+            "chunk_index": i,
+            "total_chunks": len(issue_chunks),
+            "content_type": "issue"
+        }
+        
+        # Create chunk object
+        chunks.append({
+            "id": chunk_id,
+            "text": chunk,
+            "type": "issue",
+            "repository": repo_name,
+            "issue_number": issue_number,
+            "issue_id": issue_id,
+            "metadata": {
+                **metadata,
+                "created_at": issue["created_at"],
+                "updated_at": issue["updated_at"]
+            }
+        })
+    
+    # Process each comment separately
+    for comment_idx, comment in enumerate(comments):
+        # Include issue context but avoid timestamp duplication
+        # The comment already has a timestamp in its header, so we don't need to repeat it in the content
+        comment_text = f"## Comment by {comment['author']} on {comment['created_at']}\n\nContext from issue #{issue_number}:\n{issue_context}\n\n{comment['body']}\n\nLast updated: {comment['updated_at']}"
+        
+        # Chunk the comment text if needed
+        comment_chunks = chunker._split_text_into_chunks(comment_text)
+        
+        # Create metadata for each comment chunk
+        for i, chunk in enumerate(comment_chunks):
+            chunk_id = f"{issue_doc_id}-comment-{comment_idx}-chunk-{i}"
+            metadata = {
+                "repo_name": repo_name,
+                "issue_number": issue_number,
+                "issue_title": issue["title"],
+                "issue_state": issue["state"],
+                "comment_author": comment["author"],
+                "chunk_index": i,
+                "total_chunks": len(comment_chunks),
+                "comment_index": comment_idx,
+                "content_type": "comment"
+            }
+            
+            # Create chunk object
+            chunks.append({
+                "id": chunk_id,
+                "text": chunk,
+                "type": "comment",
+                "repository": repo_name,
+                "issue_number": issue_number,
+                "issue_id": issue_id,
+                "metadata": {
+                    **metadata,
+                    "created_at": comment["created_at"],
+                    "updated_at": comment["updated_at"] if "updated_at" in comment else comment["created_at"]
+                }
+            })
+    
+    return chunks
+
+
 def embed_database_to_chromadb(
     repo_name: str,
     sqlite_db_path: Optional[str] = None,
@@ -156,7 +282,9 @@ def embed_database_to_chromadb(
     api_key: Optional[str] = None,
     credentials_path: Optional[str] = None,
     limit_issues: Optional[int] = None,
-    resume: bool = True
+    resume: bool = True,
+    num_chunk_workers: Optional[int] = None,
+    num_embed_workers: int = 4
 ) -> Dict[str, Any]:
     """
     Process all issues from a SQLite database, chunk them, and embed them into ChromaDB.
@@ -174,6 +302,10 @@ def embed_database_to_chromadb(
         credentials_path: Path to Google Cloud credentials file.
         limit_issues: Maximum number of issues to process.
         resume: Whether to resume from the last processed issue.
+        num_chunk_workers: Number of processes chunking issues. Defaults to the number of
+            CPUs, at most _MAX_DEFAULT_CHUNK_WORKERS. Runs with fewer than
+            _MIN_ISSUES_FOR_CHUNK_POOL pending issues chunk them in this thread instead.
+        num_embed_workers: Number of threads calling the embedding API concurrently.
         
     Returns:
         Dictionary with statistics about the embedding process.
@@ -198,12 +330,6 @@ def embed_database_to_chromadb(
         credentials_path=credentials_path
     )
     
-    # Initialize the chunker
-    chunker = LlamaIndexChunker(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap
-    )
-    
     # Get all repositories
     repositories = get_repositories(db_path)
     logger.info(f"Found {len(repositories)} repositories in the database")
@@ -233,17 +359,7 @@ def embed_database_to_chromadb(
             logger.info(f"Found {len(existing_doc_ids)} existing documents in ChromaDB")
     except Exception as e:
         logger.warning(f"Error getting existing documents from ChromaDB: {e}")
-    
-    # Process each repository
-    total_chunks = 0
-    total_issues = 0
-    total_embedded = 0
-    total_skipped = 0
-    
-    # Batch processing variables
-    current_batch = []
-    batch_count = 0
-    
+
     # Get all issues for the repository
     query = """
         SELECT i.id, i.number, i.title, i.body, i.created_at, i.updated_at, i.state,
@@ -251,150 +367,116 @@ def embed_database_to_chromadb(
         FROM issues i
         WHERE i.repo_id = ?
     """
-    
+
     if limit_issues:
         query += f" LIMIT {limit_issues}"
-    
+
     cursor.execute(query, (repo_id,))
     issues = cursor.fetchall()
-    
+
     logger.info(f"Found {len(issues)} issues for repository {repo_name}")
     
-    # Process each issue
-    for issue in tqdm(issues, desc="Processing issues"):
-        issue_id = issue["id"]
-        issue_number = issue["number"]
-        
-        # Generate a unique ID for this issue
-        issue_doc_id = f"issue-{repo_name}-{issue_number}"
-        
-        # Skip if this issue has already been embedded
+    # Skip issues that have already been embedded
+    total_skipped = 0
+    pending_issues = []
+    for issue in issues:
+        issue_doc_id = f"issue-{repo_name}-{issue['number']}"
         if resume and issue_doc_id in existing_doc_ids:
-            logger.debug(f"Skipping issue #{issue_number} (already embedded)")
+            logger.debug(f"Skipping issue #{issue['number']} (already embedded)")
             total_skipped += 1
             continue
+        pending_issues.append(dict(issue))
+    
+    # Chunking (CPU-bound) runs in a process pool, embedding (network-bound) in a thread pool,
+    # and this thread reads from SQLite and writes embedded batches to ChromaDB, so all three overlap.
+    # Small runs chunk inline: starting the worker processes would cost more than it saves.
+    use_chunk_pool = len(pending_issues) >= _MIN_ISSUES_FOR_CHUNK_POOL
+    num_chunk_workers = num_chunk_workers or min(_MAX_DEFAULT_CHUNK_WORKERS, os.cpu_count() or 1)
+    max_pending_issues = num_chunk_workers * 4
+    max_pending_batches = num_embed_workers * 2
+    
+    total_chunks = 0
+    batch_count = 0
+    current_batch = []
+    chunk_futures = deque()
+    embed_futures = deque()
+    
+    # Workers are spawned rather than forked: the ChromaDB and Vertex AI clients already hold
+    # threads and locks in this process, and this function may itself run in a worker thread
+    chunk_pool_context = (
+        ProcessPoolExecutor(max_workers=num_chunk_workers, mp_context=multiprocessing.get_context("spawn"))
+        if use_chunk_pool else nullcontext()
+    )
+    
+    with chunk_pool_context as chunk_pool, \
+            ThreadPoolExecutor(max_workers=num_embed_workers) as embed_pool:
         
-        # Process the issue text
-        issue_doc_id = f"issue-{repo_name}-{issue_number}"
-        
-        # Format issue text with clear structure and add updated timestamp at the end
-        issue_text = f"## Issue #{issue_number}: {issue['title']}\n\nCreated by {issue['author']} on {issue['created_at']}\n\n{issue['body']}\n\nLast updated: {issue['updated_at']}"
-        
-        # Get the first 100 characters of the issue body for context in comments
-        issue_context = issue['body'][:100] + "..." if issue['body'] and len(issue['body']) > 100 else issue['body'] or ""
+        def write_batch():
+            # Write the oldest embedded batch, waiting for its embeddings if needed
+            nonlocal batch_count
+            batch, future = embed_futures.popleft()
+            embedding_client.add_chunks(batch, embeddings=future.result())
+            logger.debug(f"Processed batch {batch_count} with {len(batch)} chunks")
+            batch_count += 1
         
-        # Chunk the issue text
-        issue_chunks = chunker._split_text_into_chunks(issue_text)
+        def submit_batch(batch):
+            texts = [chunk["text"] for chunk in batch]
+            embed_futures.append((batch, embed_pool.submit(embedding_client.embedding_function, texts)))
+            while len(embed_futures) > max_pending_batches:
+                write_batch()
         
-        # Create metadata for each issue chunk
-        for i, chunk in enumerate(issue_chunks):
-            chunk_id = f"{issue_doc_id}-issue-chunk-{i}"
-            metadata = {
-                "repo_name": repo_name,
-                "issue_number": issue_number,
-                "issue_title": issue["title"],
-                "issue_state": issue["state"],
-                "issue_author": issue["author"],
-                "issue_url": issue["html_url"],
-                "chunk_index": i,
-                "total_chunks": len(issue_chunks),
-                "content_type": "issue"
-            }
+        def collect_chunks(chunks):
+            nonlocal current_batch, total_chunks
+            total_chunks += len(chunks)
+            current_batch.extend(chunks)
             
-            # Create chunk object
-            chunk_object = {
-                "id": chunk_id,
-                "text": chunk,
-                "type": "issue",
-                "repository": repo_name,
-                "issue_number": issue_number,
-                "issue_id": issue_id,
-                "metadata": {
-                    **metadata,
-                    "created_at": issue["created_at"],
-                    "updated_at": issue["updated_at"]
-                }
-            }
-            current_batch.append(chunk_object)
-            total_chunks += 1
-            
-            # If we've reached the batch size, process the batch
-            if len(current_batch) >= batch_size:
-                embedding_client.add_chunks(current_batch)
-                logger.debug(f"Processed batch {batch_count} with {len(current_batch)} chunks")
-                batch_count += 1
-                current_batch = []
-        
-        # Get comments for this issue
-        cursor.execute(
-            """
-            SELECT c.id, c.body, c.created_at, c.updated_at, c.author
-            FROM comments c
-            WHERE c.issue_id = ?
-            ORDER BY c.created_at ASC
-            """,
-            (issue_id,)
-        )
-        comments = cursor.fetchall()
+            # If we've reached the batch size, send the batch for embedding
+            while len(current_batch) >= batch_size:
+                submit_batch(current_batch[:batch_size])
+                current_batch = current_batch[batch_size:]
         
-        # Process each comment separately
-        for comment_idx, comment in enumerate(comments):
-            # Include issue context but avoid timestamp duplication
-            # The comment already has a timestamp in its header, so we don't need to repeat it in the content
-            comment_text = f"## Comment by {comment['author']} on {comment['created_at']}\n\nContext from issue #{issue_number}:\n{issue_context}\n\n{comment['body']}\n\nLast updated: {comment['updated_at']}"
-            
-            # Chunk the comment text if needed
-            comment_chunks = chunker._split_text_into_chunks(comment_text)
-            
-            # Create metadata for each comment chunk
-            for i, chunk in enumerate(comment_chunks):
-                chunk_id = f"{issue_doc_id}-comment-{comment_idx}-chunk-{i}"
-                metadata = {
-                    "repo_name": repo_name,
-                    "issue_number": issue_number,
-                    "issue_title": issue["title"],
-                    "issue_state": issue["state"],
-                    "comment_author": comment["author"],
-                    "chunk_index": i,
-                    "total_chunks": len(comment_chunks),
-                    "comment_index": comment_idx,
-                    "content_type": "comment"
-                }
+        with tqdm(total=len(pending_issues), desc="Processing issues") as pbar:
+            for issue in pending_issues:
+                # Get comments for this issue
+                cursor.execute(
+                    """
+                    SELECT c.id, c.body, c.created_at, c.updated_at, c.author
+                    FROM comments c
+                    WHERE c.issue_id = ?
+                    ORDER BY c.created_at ASC
+                    """,
+                    (issue["id"],)
+                )
+                comments = [dict(comment) for comment in cursor.fetchall()]
                 
-                # Create chunk object
-                chunk_object = {
-                    "id": chunk_id,
-                    "text": chunk,
-                    "type": "comment",
-                    "repository": repo_name,
-                    "issue_number": issue_number,
-                    "issue_id": issue_id,
-                    "metadata": {
-                        **metadata,
-                        "created_at": comment["created_at"],
-                        "updated_at": comment["updated_at"] if "updated_at" in comment else comment["created_at"]
-                    }
-                }
-                current_batch.append(chunk_object)
-                total_chunks += 1
+                if chunk_pool is None:
+                    collect_chunks(chunk_issue_for_embedding(
+                        repo_name, issue, comments, chunk_size, chunk_overlap
+                    ))
+                    pbar.update(1)
+                    continue
                 
-                # If we've reached the batch size, process the batch
-                if len(current_batch) >= batch_size:
-                    embedding_client.add_chunks(current_batch)
-                    logger.debug(f"Processed batch {batch_count} with {len(current_batch)} chunks")
-                    batch_count += 1
-                    current_batch = []
+                chunk_futures.append(chunk_pool.submit(
+                    chunk_issue_for_embedding, repo_name, issue, comments, chunk_size, chunk_overlap
+                ))
+                
+                # Keep a bounded number of issues in flight, collecting them in order
+                if len(chunk_futures) >= max_pending_issues:
+                    collect_chunks(chunk_futures.popleft().result())
+                    pbar.update(1)
+            
+            while chunk_futures:
+                collect_chunks(chunk_futures.popleft().result())
+                pbar.update(1)
         
-        total_embedded += 1
+        # Process any remaining chunks in the last batch
+        if current_batch:
+            submit_batch(current_batch)
         
-        # Log progress
-        if total_embedded % 10 == 0:
-            logger.debug(f"Embedded {total_embedded} issues ({total_chunks} chunks)")
+        while embed_futures:
+            write_batch()
     
-    # Process any remaining chunks in the last batch
-    if current_batch:
-        embedding_client.add_chunks(current_batch)
-        logger.debug(f"Processed final batch with {len(current_batch)} chunks")
+    total_embedded = len(pending_issues)
     
     # Close the database connection
     conn.close()
@@ -411,6 +493,35 @@ def embed_database_to_chromadb(
     }
 
 
+async def embed_database_to_chromadb_async(
+    repo_name: str,
+    num_embed_workers: int = 4,
+    **kwargs: Any
+) -> Dict[str, Any]:
+    """
+    Asynchronous version of embed_database_to_chromadb.
+    
+    The pipeline runs in a worker thread so the event loop stays free, with up to
+    num_embed_workers embedding batches in flight while SQLite reads and chunking continue.
+    Its chunking processes are spawned, not forked, so they don't inherit the event
+    loop's thread state.
+    
+    Args:
+        repo_name: Name of the repository.
+        num_embed_workers: Number of threads calling the embedding API concurrently.
+        **kwargs: Other arguments of embed_database_to_chromadb.
+        
+    Returns:
+        Dictionary with statistics about the embedding process.
+    """
+    return await asyncio.to_thread(
+        embed_database_to_chromadb,
+        repo_name,
+        num_embed_workers=num_embed_workers,
+        **kwargs
+    )
+
+
 def main():
     """
     Main function to embed a database of issues into ChromaDB.
@@ -5,8 +5,14 @@ This module provides a custom embedding function for Google's text-embedding-005
 that is compatible with ChromaDB's embedding function interface.
 """
 
+import os
 import logging
-from typing import List, Optional
+import hashlib
+import sqlite3
+import threading
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 import re
 
 import vertexai
@@ -97,3 +103,118 @@ class GoogleVertexEmbeddingFunctionCustom:
                     raise ValueError(f"API error: {str(e)}")
 
         return embeddings
+
+
+
+class CachedVertexEmbedding:
+    """
+    Embedding function wrapper that caches embeddings on disk, keyed by the SHA-256 of the text.
+    Only texts missing from the cache are sent to the wrapped embedding function.
+    This class is compatible with ChromaDB's embedding function interface.
+    """
+
+    def __init__(self, embedding_function: Any, cache_dir: str = "./data/embedding_cache"):
+        """
+        Initialize the cached embedding function.
+
+        Args:
+            embedding_function: The embedding function to call on cache misses.
+            cache_dir: Directory holding the on-disk cache.
+        """
+        self.embedding_function = embedding_function
+        # Namespace keys by model so switching models never returns stale vectors
+        self._key_prefix = f"{getattr(embedding_function, 'model_name', '')}\0".encode("utf-8")
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(cache_dir, "embeddings.db"), check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB)"
+        )
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(self._key_prefix + text.encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            key_batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(key_batch))
+            rows = self._conn.execute(
+                f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})", key_batch
+            )
+            for key, blob in rows:
+                found[key] = array("d", blob).tolist()
+        return found
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts, using cached embeddings where available.
+
+        Args:
+            input: List of texts to embed.
+
+        Returns:
+            List of embeddings.
+        """
+        keys = [self._key(text) for text in input]
+
+        with self._lock:
+            embeddings = self._lookup(list(set(keys)))
+
+        # Embed each distinct missing text once
+        missing = {}
+        for key, text in zip(keys, input):
+            if key not in embeddings and key not in missing:
+                missing[key] = text
+
+        if missing:
+            logger.info(f"Embedding cache: {len(input) - len(missing)} hits, {len(missing)} misses")
+            new_embeddings = self.embedding_function(list(missing.values()))
+            rows = []
+            for key, embedding in zip(missing, new_embeddings):
+                embedding = [float(value) for value in embedding]
+                embeddings[key] = embedding
+                rows.append((key, array("d", embedding).tobytes()))
+
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)", rows
+                )
+                self._conn.commit()
+
+        return [embeddings[key] for key in keys]
+
+
+@lru_cache(maxsize=4)
+def get_embedding_function(
+    project_id: str,
+    credentials_path: Optional[str] = None,
+    location: str = "us-central1",
+    model_name: str = "text-embedding-005"
+) -> GoogleVertexEmbeddingFunctionCustom:
+    """
+    Get a process-wide Google Vertex AI embedding function.
+
+    Instances are cached per argument combination, so Vertex AI initialization, credential
+    loading and model lookup happen once per process rather than once per caller.
+
+    Args:
+        project_id: Google Cloud project ID.
+        credentials_path: Path to service account credentials file.
+        location: Google Cloud location.
+        model_name: Model name to use for embeddings.
+
+    Returns:
+        The shared embedding function.
+    """
+    return GoogleVertexEmbeddingFunctionCustom(
+        project_id=project_id,
+        location=location,
+        model_name=model_name,
+        credentials_path=credentials_path
+    )
@@ -19,7 +19,8 @@ class LlamaIndexChunker:
             self,
             chunk_size: int = 500,
             chunk_overlap: int = 100,
-            issue_context_chars: int = 100
+            issue_context_chars: int = 100,
+            count_tokens: bool = False
         ):
         """
         Initialize the LlamaIndex issue chunker.
@@ -28,10 +29,13 @@ class LlamaIndexChunker:
             chunk_size: Target size of each chunk in tokens.
             chunk_overlap: Number of tokens to overlap between chunks.
             issue_context_chars: Number of characters from the issue to include in comment chunks.
+            count_tokens: Whether to record each chunk's token count (as counted by the splitter's
+                tokenizer) in chunk["n_tokens"].
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.issue_context_chars = issue_context_chars
+        self.count_tokens = count_tokens
         
         # Initialize the LlamaIndex sentence splitter
         self.splitter = SentenceSplitter(
@@ -40,6 +44,24 @@ class LlamaIndexChunker:
             paragraph_separator="\n\n",  # Respect paragraph breaks
         )
     
+    def set_chunk_params(self, chunk_size: int, chunk_overlap: int) -> None:
+        """
+        Change the chunk size and overlap without rebuilding the splitter.
+        
+        Args:
+            chunk_size: Target size of each chunk in tokens.
+            chunk_overlap: Number of tokens to overlap between chunks.
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Chunk overlap ({chunk_overlap}) is larger than chunk size ({chunk_size})"
+            )
+        
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.splitter.chunk_size = chunk_size
+        self.splitter.chunk_overlap = chunk_overlap
+    
     def _split_text_into_chunks(self, text: str) -> List[str]:
         """
         Split text into chunks using LlamaIndex's SentenceSplitter.
@@ -198,4 +220,12 @@ class LlamaIndexChunker:
         comment_chunks = self.chunk_comments(issue, comments)
         
         # Combine all chunks
-        return issue_chunks + comment_chunks
+        chunks = issue_chunks + comment_chunks
+        
+        if self.count_tokens:
+            # Count with the same tokenizer the splitter used to size the chunks
+            tokenizer = self.splitter._tokenizer
+            for chunk in chunks:
+                chunk["n_tokens"] = len(tokenizer(chunk["text"]))
+        
+        return chunks
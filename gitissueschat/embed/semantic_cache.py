@@ -0,0 +1,248 @@
+"""
+Semantic Query Cache
+
+This module provides an in-process cache of ChromaDB query results keyed by query embedding.
+A query whose embedding is close enough (by cosine similarity) to a previously seen query
+reuses that query's results instead of searching the collection again.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class SemanticQueryCache:
+    """
+    Cache of query results, looked up by cosine similarity of the query embedding.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1000):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cached query to count as a hit.
+            max_entries: Maximum number of cached queries; the oldest are evicted first.
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # Ring buffer of normalized embeddings, allocated with max_entries rows on the
+        # first add; row i belongs to _keys[i] and _results[i], and _next is the slot
+        # overwritten by the next add (the oldest entry once the buffer is full)
+        self._embeddings: Optional[np.ndarray] = None
+        self._keys: List[Any] = []
+        self._results: List[Dict[str, Any]] = []
+        self._next = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def lookup(self, embedding: List[float], key: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Find cached results for a query embedding.
+
+        Args:
+            embedding: The query embedding.
+            key: Extra query parameters (e.g. n_results, filters) that must match exactly.
+
+        Returns:
+            The cached results, or None on a miss.
+        """
+        if not self._keys:
+            return None
+
+        # One matrix-vector product scores every cached query
+        similarities = self._embeddings[:len(self._keys)] @ self._normalize(embedding)
+        for i in np.argsort(similarities)[::-1]:
+            if similarities[i] < self.threshold:
+                break
+            if self._keys[i] == key:
+                logger.info(f"Semantic cache hit (similarity {similarities[i]:.4f})")
+                return self._results[i]
+
+        return None
+
+    def add(self, embedding: List[float], results: Dict[str, Any], key: Any = None) -> None:
+        """
+        Add the results of a query to the cache.
+
+        Args:
+            embedding: The query embedding.
+            results: The query results.
+            key: Extra query parameters the results depend on.
+        """
+        vector = self._normalize(embedding)
+        if self._embeddings is None:
+            self._embeddings = np.empty((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+        # Write into the next slot in place, evicting the oldest entry once full
+        slot = self._next
+        self._embeddings[slot] = vector
+        if slot < len(self._keys):
+            self._keys[slot] = key
+            self._results[slot] = results
+        else:
+            self._keys.append(key)
+            self._results.append(results)
+        self._next = (slot + 1) % self.max_entries
+
+    def _chronological_slots(self) -> List[int]:
+        # Slots from the oldest entry to the newest
+        if len(self._keys) < self.max_entries:
+            return list(range(len(self._keys)))
+        return list(range(self._next, self.max_entries)) + list(range(self._next))
+
+    def save(self, path: str) -> None:
+        """
+        Save the cache to disk. Cached results must be JSON-serializable.
+
+        Args:
+            path: Path prefix; the embeddings are written to <path>.npy and the
+                keys and results to <path>.json.
+        """
+        if not self._keys:
+            return
+
+        slots = self._chronological_slots()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.save(f"{path}.npy", self._embeddings[slots])
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "keys": [self._keys[i] for i in slots],
+                "results": [self._results[i] for i in slots],
+            }, f)
+
+    @classmethod
+    def load(cls, path: str, threshold: float = 0.95, max_entries: int = 1000) -> "SemanticQueryCache":
+        """
+        Load a cache saved with save(), or create an empty one if none exists.
+
+        Args:
+            path: Path prefix the cache was saved with.
+            threshold: Minimum cosine similarity for a cached query to count as a hit.
+            max_entries: Maximum number of cached queries.
+
+        Returns:
+            The loaded cache.
+        """
+        cache = cls(threshold=threshold, max_entries=max_entries)
+        if os.path.exists(f"{path}.npy") and os.path.exists(f"{path}.json"):
+            embeddings = np.load(f"{path}.npy")
+            with open(f"{path}.json", encoding="utf-8") as f:
+                data = json.load(f)
+            # Saved oldest first, so adding them in order keeps the newest max_entries
+            for embedding, key, results in zip(embeddings, data["keys"], data["results"]):
+                # JSON turns tuple keys into lists
+                cache.add(embedding, results, tuple(key) if isinstance(key, list) else key)
+            logger.info(f"Loaded {len(cache._results)} cached queries from {path}")
+        return cache
+
+
+# One cache per collection, shared by every caller in the process
+_query_caches: Dict[Tuple[str, str], SemanticQueryCache] = {}
+
+# Keys of a ChromaDB query result that hold one inner list per query embedding
+_PER_QUERY_KEYS = ("ids", "documents", "metadatas", "distances", "embeddings")
+
+
+def _cache_for(collection: Any) -> SemanticQueryCache:
+    # Collection IDs are unique across clients and paths; the name is kept for collections
+    # that don't expose one
+    identity = (str(getattr(collection, "id", "")), collection.name)
+    cache = _query_caches.get(identity)
+    if cache is None:
+        cache = _query_caches[identity] = SemanticQueryCache()
+    return cache
+
+
+def _split_results(results: Dict[str, Any], count: int) -> List[Dict[str, Any]]:
+    # ChromaDB returns one inner list per query embedding; split them into single-query results
+    split = []
+    for i in range(count):
+        split.append({
+            key: [value[i]] if key in _PER_QUERY_KEYS and value is not None else value
+            for key, value in results.items()
+        })
+    return split
+
+
+def cached_queries(
+    collection: Any,
+    embedding_function: Any,
+    query_texts: List[str],
+    n_results: int = 5,
+    where: Optional[Dict[str, Any]] = None,
+    query_embeddings: Optional[List[List[float]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Query a ChromaDB collection with several queries at once, reusing the results of
+    semantically identical earlier queries.
+
+    All query texts are embedded in one call, and the cache misses are sent to ChromaDB
+    as one batched query.
+
+    Args:
+        collection: The ChromaDB collection to query.
+        embedding_function: Function used to embed the query texts.
+        query_texts: Query texts.
+        n_results: Number of results to return per query.
+        where: Optional filter criteria.
+        query_embeddings: Optional precomputed embeddings of the query texts.
+
+    Returns:
+        One query result per query text, each in ChromaDB's single-query format.
+    """
+    embeddings = query_embeddings if query_embeddings is not None else embedding_function(query_texts)
+    key = (n_results, repr(where))
+    query_cache = _cache_for(collection)
+
+    all_results = [query_cache.lookup(embedding, key) for embedding in embeddings]
+    misses = [i for i, results in enumerate(all_results) if results is None]
+
+    if misses:
+        miss_embeddings = [embeddings[i] for i in misses]
+        results = collection.query(
+            query_embeddings=miss_embeddings,
+            n_results=n_results,
+            where=where
+        )
+        for i, miss_results in zip(misses, _split_results(results, len(misses))):
+            all_results[i] = miss_results
+            query_cache.add(embeddings[i], miss_results, key)
+
+    return all_results
+
+
+def cached_query(
+    collection: Any,
+    embedding_function: Any,
+    query_text: str,
+    n_results: int = 5,
+    where: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Query a ChromaDB collection, reusing the results of a semantically identical earlier query.
+
+    Args:
+        collection: The ChromaDB collection to query.
+        embedding_function: Function used to embed the query text.
+        query_text: Query text.
+        n_results: Number of results to return.
+        where: Optional filter criteria.
+
+    Returns:
+        Query results in ChromaDB's format.
+    """
+    return cached_queries(collection, embedding_function, [query_text], n_results, where)[0]
@@ -0,0 +1,111 @@
+"""
+SQLite issue loader.
+
+This module provides functionality for loading a single issue and its comments from the
+SQLite database, for chunking experiments that repeatedly work on the same issue.
+"""
+
+import sqlite3
+from functools import lru_cache
+from typing import Dict, Any
+
+# One connection per database file, reused across calls
+_conn_cache: Dict[str, sqlite3.Connection] = {}
+
+
+def _get_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Get the cached connection for a database, opening it on first use.
+
+    Args:
+        db_path: Path to the SQLite database.
+
+    Returns:
+        SQLite connection object.
+    """
+    conn = _conn_cache.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+
+        # Tune the connection for repeated reads; it is never used for writes. Settings
+        # stored in the file (journal mode, indexes) are left to the storage layer.
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA query_only=1")
+
+        _conn_cache[db_path] = conn
+    return conn
+
+
+@lru_cache(maxsize=256)
+def _load_issue_with_comments(db_path: str, repo_name: str, issue_number: int) -> Dict[str, Any]:
+    """
+    Load an issue and its comments from the database. Results are cached per
+    (db_path, repo_name, issue_number) and must not be mutated by callers.
+    """
+    conn = _get_connection(db_path)
+
+    # Get repository ID
+    cursor = conn.execute("SELECT id FROM repositories WHERE name = ?", (repo_name,))
+    repo_row = cursor.fetchone()
+
+    if not repo_row:
+        raise ValueError(f"Repository {repo_name} not found in database")
+
+    repo_id = repo_row[0]
+
+    # Get issue
+    cursor = conn.execute(
+        """
+        SELECT * FROM issues
+        WHERE repo_id = ? AND number = ?
+        """,
+        (repo_id, issue_number)
+    )
+    issue_row = cursor.fetchone()
+
+    if not issue_row:
+        raise ValueError(f"Issue #{issue_number} not found in repository {repo_name}")
+
+    # Convert to dictionary
+    issue_columns = tuple(d[0] for d in cursor.description)
+    issue = dict(zip(issue_columns, issue_row))
+    issue["repository"] = repo_name
+
+    # Get comments for the issue
+    cursor = conn.execute(
+        """
+        SELECT * FROM comments
+        WHERE issue_id = ?
+        ORDER BY created_at
+        """,
+        (issue["id"],)
+    )
+    # Resolve column names once rather than per row
+    comment_columns = tuple(d[0] for d in cursor.description)
+    issue["comments"] = [dict(zip(comment_columns, row)) for row in cursor.fetchall()]
+
+    return issue
+
+
+def get_issue_with_comments(db_path: str, repo_name: str, issue_number: int) -> Dict[str, Any]:
+    """
+    Retrieve an issue and its comments from the SQLite database.
+
+    Repeated calls for the same issue are served from an in-process cache.
+
+    Args:
+        db_path: Path to the SQLite database.
+        repo_name: Repository name in the format 'owner/repo'.
+        issue_number: Issue number to retrieve.
+
+    Returns:
+        A dictionary containing the issue data with comments.
+    """
+    cached = _load_issue_with_comments(db_path, repo_name, issue_number)
+
+    # Return a copy so callers (e.g. the chunker, which pops "comments") can't alter the cache
+    issue = dict(cached)
+    issue["comments"] = [dict(comment) for comment in cached["comments"]]
+    return issue
@@ -5,8 +5,9 @@ This module provides the main orchestrator for the RAG system, integrating
 the retriever and generator components.
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, AsyncIterator, Optional
 
 from gitissueschat.rag.chroma_retriever import ChromaRetriever
 from gitissueschat.rag.gemini_generator import GeminiGenerator
@@ -67,6 +68,23 @@ class RAGOrchestrator:
         
         logger.info(f"Initialized RAGOrchestrator with top_k={top_k}, relevance_threshold={relevance_threshold}")
     
+    async def retrieve_stream(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Retrieve relevant chunks for a query without blocking the event loop.
+        
+        The ChromaDB query runs in a worker thread; chunks are yielded once it returns,
+        so callers can start other work (e.g. generation) while they consume them.
+        
+        Args:
+            query: Query text.
+            
+        Yields:
+            Relevant chunks, most similar first.
+        """
+        chunks = await asyncio.to_thread(self.retriever.retrieve, query)
+        for chunk in chunks:
+            yield chunk
+    
     def process_query(self, query: str) -> str:
         """
         Process a query and generate a response.
@@ -77,6 +95,18 @@ class RAGOrchestrator:
         Returns:
             Response text.
         """
+        return self.process_query_with_chunks(query)["response"]
+    
+    def process_query_with_chunks(self, query: str) -> Dict[str, Any]:
+        """
+        Process a query and generate a response, keeping the chunks it was based on.
+        
+        Args:
+            query: Query text.
+            
+        Returns:
+            Dictionary with the response text, the retrieved chunks and their number.
+        """
         logger.info(f"Processing query: {query}")
         
         # Retrieve relevant chunks
@@ -87,7 +117,9 @@ class RAGOrchestrator:
         
         # Extract response text from result
         if isinstance(result, dict) and "response" in result:
-            return result["response"]
+            response = result["response"]
+        else:
+            # For backward compatibility
+            response = result
         
-        # For backward compatibility
-        return result
+        return {"response": response, "chunks": chunks, "num_chunks": len(chunks)}
@@ -12,7 +12,7 @@ def analyze_chunks(jsonl_file, target_size=None):
     """Analyze the token counts of chunks in a JSONL file."""
     tokenizer = tiktoken.get_encoding("cl100k_base")
     
-    with open(jsonl_file, 'r') as f:
+    with open(jsonl_file, 'r', encoding='utf-8') as f:
         lines = f.readlines()
     
     print(f"Analyzing {len(lines)} chunks in {jsonl_file}")
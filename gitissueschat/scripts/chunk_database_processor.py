@@ -2,19 +2,85 @@
 Process chunks to ChromaDB
 
 This module provides functionality for processing chunks from a JSONL file and storing them in ChromaDB.
+
+Reading, embedding and writing run as a pipeline connected by bounded queues: a reader thread
+parses the JSONL file into batches, a pool of worker threads embeds the batches (the embedding
+API is network-bound), and the calling thread writes the embedded batches to ChromaDB.
 """
 
 import json
+import queue
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Dict, List, Any, Iterator, Optional
 from tqdm import tqdm
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 from gitissueschat.embed.chroma_database import ChunksDatabase
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Marker passed through the queues to signal the end of a stage
+_SENTINEL = object()
+
+
+def iter_jsonl(path: str, bufsize: int = 1 << 22) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a JSONL file, reading it in large binary slabs rather than line by line.
+
+    Args:
+        path: Path to the JSONL file.
+        bufsize: Number of bytes to read at a time (4 MiB by default).
+
+    Yields:
+        One dictionary per non-empty line.
+    """
+    tail = b""
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(bufsize)
+            if not data:
+                break
+
+            # Keep the incomplete last line for the next slab
+            lines = (tail + data).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield _json_loads(line)
+
+    if tail.strip():
+        yield _json_loads(tail)
+
+
+def iter_chunk_batches(chunks_file: str, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Read chunks from a JSONL file in batches.
+
+    Args:
+        chunks_file: Path to the JSONL file with chunks.
+        batch_size: Number of chunks per batch.
+
+    Yields:
+        Lists of at most batch_size chunk dictionaries.
+    """
+    batch = []
+    for chunk in iter_jsonl(chunks_file):
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
 
 def process_chunks_to_db(
     chunks_file: str,
@@ -23,11 +89,13 @@ def process_chunks_to_db(
     project_id: Optional[str] = None,
     api_key: Optional[str] = None,
     credentials: Optional[str] = None,
-    batch_size: int = 100
+    batch_size: int = 100,
+    num_workers: int = 4,
+    queue_size: int = 4
 ) -> Dict[str, Any]:
     """
     Process chunks from a JSONL file and store them in ChromaDB.
-    
+
     Args:
         chunks_file: Path to the JSONL file with chunks.
         db_path: Path to the ChromaDB database.
@@ -36,33 +104,112 @@ def process_chunks_to_db(
         api_key: Google API key.
         credentials: Path to the Google Cloud service account key file.
         batch_size: Number of chunks to process at once.
-        
+        num_workers: Number of threads calling the embedding API concurrently.
+        queue_size: Maximum number of batches buffered between pipeline stages.
+
     Returns:
         Statistics about the database.
+
+    Raises:
+        ValueError: If num_workers is less than 1.
     """
-    # Load chunks from JSONL file
-    chunks = []
-    with open(chunks_file, 'r') as f:
-        for line in f:
-            chunks.append(json.loads(line))
-    
-    logger.info(f"Loaded {len(chunks)} chunks from {chunks_file}")
-    
+    # Without an embedding worker nothing drains the queue, and the reader blocks on it forever
+    if num_workers < 1:
+        raise ValueError(f"num_workers must be at least 1, got {num_workers}")
+
     # Initialize the database
     db = ChunksDatabase(
         db_path=db_path,
         collection_name=collection_name,
         project_id=project_id,
         api_key=api_key,
-        credentials=credentials
+        credentials_path=credentials
     )
-    
-    # Process chunks in batches
-    for i in tqdm(range(0, len(chunks), batch_size), desc="Processing chunks"):
-        batch = chunks[i:i + batch_size]
-        
-        # Add chunks to the database
-        db.add_chunks(chunks=batch)
-    
+
+    embed_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    errors = []
+
+    def put(q: queue.Queue, item: Any) -> bool:
+        # Block until there is room in the queue, unless another stage has failed
+        while not stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q: queue.Queue) -> Any:
+        # Block until an item is available, unless another stage has failed
+        while not stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _SENTINEL
+
+    def read_batches():
+        try:
+            for batch in iter_chunk_batches(chunks_file, batch_size):
+                if not put(embed_queue, batch):
+                    return
+        except Exception as e:
+            errors.append(e)
+            stop_event.set()
+        finally:
+            for _ in range(num_workers):
+                put(embed_queue, _SENTINEL)
+
+    def embed_batches():
+        try:
+            while True:
+                batch = get(embed_queue)
+                if batch is _SENTINEL:
+                    break
+                embeddings = db.embedding_function([chunk["text"] for chunk in batch])
+                if not put(write_queue, (batch, embeddings)):
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop_event.set()
+        finally:
+            put(write_queue, _SENTINEL)
+
+    threads = [threading.Thread(target=read_batches, daemon=True)]
+    threads += [threading.Thread(target=embed_batches, daemon=True) for _ in range(num_workers)]
+    for thread in threads:
+        thread.start()
+
+    # Write embedded batches to the database as they become available
+    total_chunks = 0
+    finished_workers = 0
+    try:
+        with tqdm(desc="Processing chunks", unit="chunk") as pbar:
+            while finished_workers < num_workers:
+                item = get(write_queue)
+                if item is _SENTINEL:
+                    if stop_event.is_set():
+                        break
+                    finished_workers += 1
+                    continue
+
+                batch, embeddings = item
+                db.add_chunks(chunks=batch, embeddings=embeddings)
+                total_chunks += len(batch)
+                pbar.update(len(batch))
+    finally:
+        # Release the other stages before waiting for them, however this loop ended
+        # (including KeyboardInterrupt); on success they have already finished
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+
+    logger.info(f"Stored {total_chunks} chunks from {chunks_file}")
+
     # Return database statistics
     return db.get_stats()
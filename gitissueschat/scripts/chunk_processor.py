@@ -87,9 +87,9 @@ def save_chunks_to_jsonl(chunks: List[Dict[str, Any]], output_path: str) -> None
         chunks: List of chunk dictionaries.
         output_path: Path to the output JSONL file.
     """
-    with open(output_path, 'w') as f:
+    with open(output_path, 'w', encoding='utf-8') as f:
         for chunk in chunks:
-            f.write(json.dumps(chunk) + '\n')
+            f.write(json.dumps(chunk, separators=(",", ":"), ensure_ascii=False) + '\n')
 
 
 def main():
@@ -2,77 +2,12 @@
 Compare different configurations of the LlamaIndexChunker on a GitHub issue with long comments.
 """
 
-import sqlite3
 import json
 import argparse
 import tiktoken
 from typing import Dict, List, Any
 from gitissueschat.embed.llamaindex_chunker import LlamaIndexChunker
-
-
-def get_issue_with_comments(db_path: str, repo_name: str, issue_number: int) -> Dict[str, Any]:
-    """
-    Retrieve an issue and its comments from the SQLite database.
-    
-    Args:
-        db_path: Path to the SQLite database.
-        repo_name: Repository name in the format 'owner/repo'.
-        issue_number: Issue number to retrieve.
-        
-    Returns:
-        A dictionary containing the issue data with comments.
-    """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    
-    # Get repository ID
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM repositories WHERE name = ?", (repo_name,))
-    repo_row = cursor.fetchone()
-    
-    if not repo_row:
-        raise ValueError(f"Repository {repo_name} not found in database")
-    
-    repo_id = repo_row[0]
-    
-    # Get issue
-    cursor.execute(
-        """
-        SELECT * FROM issues 
-        WHERE repo_id = ? AND number = ?
-        """, 
-        (repo_id, issue_number)
-    )
-    issue_row = cursor.fetchone()
-    
-    if not issue_row:
-        raise ValueError(f"Issue #{issue_number} not found in repository {repo_name}")
-    
-    # Convert to dictionary
-    issue = {key: issue_row[key] for key in issue_row.keys()}
-    issue["repository"] = repo_name
-    
-    # Get comments for the issue
-    cursor.execute(
-        """
-        SELECT * FROM comments 
-        WHERE issue_id = ? 
-        ORDER BY created_at
-        """, 
-        (issue["id"],)
-    )
-    comments = []
-    
-    for row in cursor:
-        comment = {key: row[key] for key in row.keys()}
-        comments.append(comment)
-    
-    # Add comments to the issue
-    issue["comments"] = comments
-    
-    conn.close()
-    
-    return issue
+from gitissueschat.embed.sqlite_loader import get_issue_with_comments
 
 
 def analyze_chunks(chunks: List[Dict[str, Any]], chunker_name: str):
@@ -137,9 +72,9 @@ def save_chunks_to_file(chunks: List[Dict[str, Any]], output_file: str):
         chunks: List of chunks to save.
         output_file: Path to the output file.
     """
-    with open(output_file, 'w') as f:
+    with open(output_file, 'w', encoding='utf-8') as f:
         for chunk in chunks:
-            f.write(json.dumps(chunk) + '\n')
+            f.write(json.dumps(chunk, separators=(",", ":"), ensure_ascii=False) + '\n')
     
     print(f"Saved {len(chunks)} chunks to {output_file}")
 
@@ -8,13 +8,46 @@ import os
 import logging
 import argparse
 import json
+from functools import lru_cache
 import chromadb
-from gitissueschat.embed.google_vertex_embedding_function import GoogleVertexEmbeddingFunctionCustom
+from gitissueschat.embed.google_vertex_embedding_function import get_embedding_function
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=8)
+def _get_collection(db_path: str, collection_name: str, project_id: str, credentials: str):
+    """
+    Get a ChromaDB collection with the Vertex AI embedding function attached.
+
+    The client, embedding function and collection are cached per argument tuple, so repeated
+    queries in the same process reuse them instead of re-authenticating with Vertex AI.
+
+    Args:
+        db_path: Path to the ChromaDB database.
+        collection_name: Name of the ChromaDB collection.
+        project_id: Google Cloud project ID.
+        credentials: Path to the service account credentials file.
+
+    Returns:
+        The ChromaDB collection.
+    """
+    # Initialize the embedding function
+    embedding_function = get_embedding_function(
+        project_id=project_id,
+        credentials_path=credentials
+    )
+
+    # Initialize ChromaDB client
+    client = chromadb.PersistentClient(path=db_path)
+
+    # Get collection
+    return client.get_collection(
+        name=collection_name,
+        embedding_function=embedding_function
+    )
+
 def main():
     """
     Main function to debug ChromaDB query results.
@@ -44,20 +77,7 @@ def main():
     logger.info(f"Testing ChromaDB query with db_path={args.db_path}, collection_name={args.collection_name}")
     
     try:
-        # Initialize the embedding function
-        embedding_function = GoogleVertexEmbeddingFunctionCustom(
-            project_id=project_id,
-            credentials_path=credentials
-        )
-        
-        # Initialize ChromaDB client
-        client = chromadb.PersistentClient(path=args.db_path)
-        
-        # Get collection
-        collection = client.get_collection(
-            name=args.collection_name,
-            embedding_function=embedding_function
-        )
+        collection = _get_collection(args.db_path, args.collection_name, project_id, credentials)
         
         logger.info(f"Collection count: {collection.count()}")
         
@@ -33,6 +33,7 @@ def main():
     parser.add_argument("--google-project-id", help="Google Cloud project ID")
     parser.add_argument("--google-api-key", help="Google API key")
     parser.add_argument("--batch-size", type=int, default=100, help="Number of chunks to process at once")
+    parser.add_argument("--num-workers", type=int, default=4, help="Number of concurrent embedding workers")
     
     args = parser.parse_args()
     
@@ -56,7 +57,8 @@ def main():
         project_id=project_id,
         api_key=api_key,
         credentials=None,
-        batch_size=args.batch_size
+        batch_size=args.batch_size,
+        num_workers=args.num_workers
     )
     
     logger.info(f"Successfully embedded chunks and stored them in ChromaDB at {args.db_path}")
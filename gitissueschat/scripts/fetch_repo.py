@@ -61,7 +61,8 @@ def main():
     storage = SQLiteIssueStorage(args.db_path)
 
     # Get existing issue numbers
-    existing_issue_numbers = set(storage.get_issue_numbers(args.repo))
+    existing_issue_numbers = storage.get_issue_number_set(args.repo)
+    issues_before_count = len(existing_issue_numbers)
 
     # Get the latest API call timestamp
     last_update_timestamp = None
@@ -136,7 +137,7 @@ def main():
         new_issues_count=total_new,
         updated_issues_count=total_updated,
         redundant_issues_count=total_redundant,
-        issues_before_count=storage.get_issue_count(args.repo),
+        issues_before_count=issues_before_count,
         issues_after_count=storage.get_issue_count(args.repo),
         api_rate_limit_remaining=remaining,
         api_rate_limit_total=limit,
@@ -165,9 +166,10 @@ def main():
 
         # Show database statistics
         print("Database Statistics:")
-        total_issues = storage.get_issue_count(args.repo)
-        open_issues = storage.get_issue_count(args.repo, state="open")
-        closed_issues = storage.get_issue_count(args.repo, state="closed")
+        issue_counts = storage.get_issue_counts(args.repo)
+        total_issues = issue_counts["total"]
+        open_issues = issue_counts["open"]
+        closed_issues = issue_counts["closed"]
         total_comments = storage.get_comment_count(args.repo)
 
         print(f"Total issues for {args.repo}: {total_issues}")
@@ -25,7 +25,9 @@ def migrate_database(db_path):
     cursor = conn.cursor()
 
     try:
-        # Get current UTC timestamp
+        # Get current UTC timestamp. It is used as the constant DEFAULT of the new added_at
+        # columns, so SQLite records it in the schema and existing rows read it back without
+        # a table rewrite (no backfill UPDATE needed).
         current_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
         # Add added_at column to repositories table
@@ -35,8 +37,9 @@ def migrate_database(db_path):
 
         if "added_at" not in column_names:
             print("Adding added_at column to repositories table...")
-            cursor.execute("ALTER TABLE repositories ADD COLUMN added_at TIMESTAMP")
-            cursor.execute("UPDATE repositories SET added_at = ?", (current_time,))
+            cursor.execute(
+                f"ALTER TABLE repositories ADD COLUMN added_at TIMESTAMP DEFAULT '{current_time}'"
+            )
             print("Successfully added added_at column to repositories table.")
         else:
             print("The added_at column already exists in repositories table.")
@@ -48,8 +51,9 @@ def migrate_database(db_path):
 
         if "added_at" not in column_names:
             print("Adding added_at column to issues table...")
-            cursor.execute("ALTER TABLE issues ADD COLUMN added_at TIMESTAMP")
-            cursor.execute("UPDATE issues SET added_at = ?", (current_time,))
+            cursor.execute(
+                f"ALTER TABLE issues ADD COLUMN added_at TIMESTAMP DEFAULT '{current_time}'"
+            )
             print("Successfully added added_at column to issues table.")
         else:
             print("The added_at column already exists in issues table.")
@@ -61,8 +65,9 @@ def migrate_database(db_path):
 
         if "added_at" not in column_names:
             print("Adding added_at column to comments table...")
-            cursor.execute("ALTER TABLE comments ADD COLUMN added_at TIMESTAMP")
-            cursor.execute("UPDATE comments SET added_at = ?", (current_time,))
+            cursor.execute(
+                f"ALTER TABLE comments ADD COLUMN added_at TIMESTAMP DEFAULT '{current_time}'"
+            )
             print("Successfully added added_at column to comments table.")
         else:
             print("The added_at column already exists in comments table.")
@@ -81,6 +86,45 @@ def migrate_database(db_path):
         else:
             print("The redundant_issues_count column already exists in api_logs table.")
 
+        # Add comment_count column to issues table, filled in from the stored comments
+        cursor.execute("PRAGMA table_info(issues)")
+        columns = cursor.fetchall()
+        column_names = [column[1] for column in columns]
+
+        if "comment_count" not in column_names:
+            print("Adding comment_count column to issues table...")
+            cursor.execute("ALTER TABLE issues ADD COLUMN comment_count INTEGER DEFAULT 0")
+            cursor.execute(
+                "UPDATE issues SET comment_count = "
+                "(SELECT COUNT(*) FROM comments WHERE comments.issue_id = issues.id)"
+            )
+            print("Successfully added comment_count column to issues table.")
+        else:
+            print("The comment_count column already exists in issues table.")
+
+        # Add indexes for the per-issue comment lookups and per-repo issue and API log lookups
+        print("Creating indexes on comments, issues and api_logs tables...")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_comments_issue_created ON comments(issue_id, created_at)"
+        )
+        # (repo_id, number) lookups already use the UNIQUE(repo_id, number) autoindex; drop the
+        # duplicate index earlier runs of this script created, which only added write cost
+        cursor.execute("DROP INDEX IF EXISTS idx_issues_repo_number")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_api_logs_repo_ts ON api_logs(repo_id, timestamp DESC)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_issues_repo_updated ON issues(repo_id, updated_at DESC)"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_issues_repo_state ON issues(repo_id, state)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_issues_repo_comment_count "
+            "ON issues(repo_id, comment_count DESC)"
+        )
+        # Refresh the planner statistics so the new indexes are considered
+        cursor.execute("ANALYZE")
+        print("Successfully created indexes.")
+
         conn.commit()
         conn.close()
         return True
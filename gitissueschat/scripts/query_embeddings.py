@@ -8,6 +8,11 @@ import logging
 import argparse
 from dotenv import load_dotenv
 from gitissueschat.embed.chroma_database import ChunksDatabase
+from gitissueschat.embed.google_vertex_embedding_function import (
+    CachedVertexEmbedding,
+    get_embedding_function,
+)
+from gitissueschat.embed.semantic_cache import cached_queries
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,35 +30,58 @@ def main():
     parser.add_argument("--db-path", default="./chroma_db", help="Path to the ChromaDB database")
     parser.add_argument("--collection-name", default="github_issues", help="Name of the collection to use")
     parser.add_argument("--query", default="How to use PyTorch with fastai?", help="Query text")
+    parser.add_argument("--queries", nargs="+", help="Several queries to run as one batch (overrides --query)")
     parser.add_argument("--n-results", type=int, default=3, help="Number of results to return")
     
     args = parser.parse_args()
     
+    project_id = os.environ.get("GOOGLE_PROJECT_ID")
+    credentials = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+
+    # Cache query embeddings on disk so repeated queries skip the API call
+    embedding_function = None
+    if project_id:
+        embedding_function = CachedVertexEmbedding(get_embedding_function(
+            project_id=project_id,
+            credentials_path=credentials
+        ))
+
     # Initialize database
     db = ChunksDatabase(
         db_path=args.db_path, 
         collection_name=args.collection_name,
-        project_id=os.environ.get("GOOGLE_PROJECT_ID"),
-        credentials=os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+        project_id=project_id,
+        credentials_path=credentials,
+        embedding_function=embedding_function
     )
     
-    # Query the database
-    results = db.query(args.query, n_results=args.n_results)
+    # Query the database, embedding and searching all queries in one batch
+    queries = args.queries or [args.query]
+    all_results = cached_queries(
+        db.get_collection(),
+        db.embedding_function,
+        queries,
+        n_results=args.n_results
+    )
     
-    # Print results
-    logger.info(f"Query: {args.query}")
-    logger.info(f"Found {len(results['documents'][0])} results")
+    # Print results (skipped entirely when INFO logging is off)
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
-    for i, (doc, metadata, distance) in enumerate(zip(
-        results['documents'][0], 
-        results['metadatas'][0], 
-        results['distances'][0]
-    )):
-        logger.info(f"Result {i+1}:")
-        logger.info(f"Distance: {distance}")
-        logger.info(f"Metadata: {metadata}")
-        logger.info(f"Document: {doc[:200]}...")
-        logger.info("-" * 80)
+    for query, results in zip(queries, all_results):
+        logger.info(f"Query: {query}")
+        logger.info(f"Found {len(results['documents'][0])} results")
+        
+        for i, (doc, metadata, distance) in enumerate(zip(
+            results['documents'][0], 
+            results['metadatas'][0], 
+            results['distances'][0]
+        )):
+            logger.info("Result %d:", i + 1)
+            logger.info("Distance: %s", distance)
+            logger.info("Metadata: %s", metadata)
+            logger.info("Document: %s...", doc[:200])
+            logger.info("-" * 80)
 
 
 if __name__ == "__main__":
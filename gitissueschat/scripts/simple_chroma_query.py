@@ -8,13 +8,59 @@ import os
 import json
 import logging
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
-from gitissueschat.embed.google_vertex_embedding_function import GoogleVertexEmbeddingFunctionCustom
+from gitissueschat.embed.google_vertex_embedding_function import (
+    CachedVertexEmbedding,
+    get_embedding_function,
+)
+from gitissueschat.embed.semantic_cache import cached_queries
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+def format_results(results):
+    """
+    Log query results and convert them to a JSON-serializable list.
+
+    Args:
+        results: Query results for a single query, in ChromaDB's format.
+
+    Returns:
+        List of result dictionaries with id, similarity, metadata and document.
+    """
+    if not results["ids"] or len(results["ids"][0]) == 0:
+        logger.warning("No results found")
+        return []
+        
+    logger.info(f"Found {len(results['ids'][0])} results:")
+    
+    # Convert distances to similarity scores (1 - distance)
+    # ChromaDB uses cosine distance, so similarity = 1 - distance
+    similarities = [1.0 - distance for distance in results["distances"][0]]
+    
+    # Prepare results for JSON output
+    json_results = [
+        {"id": document_id, "similarity": similarity, "metadata": metadata, "document": document}
+        for document_id, similarity, metadata, document in zip(
+            results["ids"][0], similarities, results["metadatas"][0], results["documents"][0]
+        )
+    ]
+    
+    # Log summary (skipped entirely when INFO logging is off)
+    if logger.isEnabledFor(logging.INFO):
+        for i, result in enumerate(json_results):
+            logger.info("Result %d:", i + 1)
+            logger.info("  ID: %s", result["id"])
+            logger.info("  Similarity: %.4f", result["similarity"])
+            logger.info("  Metadata: %s", result["metadata"])
+            logger.info("  Document: %s...", result["document"][:200])
+    
+    return json_results
+
+
 def main():
     """
     Main function to query ChromaDB.
@@ -27,6 +73,8 @@ def main():
                         help="Name of the ChromaDB collection")
     parser.add_argument("--query", type=str, default="where is my config data stored?",
                         help="Query to test")
+    parser.add_argument("--queries", type=str, nargs="+",
+                        help="Several queries to run as one batch (overrides --query)")
     parser.add_argument("--top-k", type=int, default=10,
                         help="Number of results to return")
     parser.add_argument("--output-file", type=str, default="query_results.json",
@@ -45,71 +93,54 @@ def main():
         logger.error("GOOGLE_APPLICATION_CREDENTIALS environment variable not set")
         return
     
-    logger.info(f"Querying ChromaDB with query: '{args.query}'")
+    queries = args.queries or [args.query]
+    logger.info(f"Querying ChromaDB with {len(queries)} queries: {queries}")
     
     try:
         # Initialize the custom embedding function
-        embedding_function = GoogleVertexEmbeddingFunctionCustom(
+        embedding_function = CachedVertexEmbedding(get_embedding_function(
             project_id=project_id,
             credentials_path=credentials
-        )
-        
-        # Initialize ChromaDB client
-        client = chromadb.PersistentClient(path=args.db_path)
-        
-        # Get collection
-        collection = client.get_collection(
-            name=args.collection_name,
-            embedding_function=embedding_function
-        )
-        
-        logger.info(f"Collection count: {collection.count()}")
-        
-        # Query the collection
-        results = collection.query(
-            query_texts=[args.query],
-            n_results=args.top_k
-        )
+        ))
         
-        # Print results
-        if not results["ids"] or len(results["ids"][0]) == 0:
-            logger.warning("No results found")
-            return
+        # Embed the queries in the background while the local database is opened
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            embeddings_future = executor.submit(embedding_function, queries)
             
-        logger.info(f"Found {len(results['ids'][0])} results:")
-        
-        # Prepare results for JSON output
-        json_results = []
-        
-        for i in range(len(results["ids"][0])):
-            # Get document and metadata
-            document_id = results["ids"][0][i]
-            document = results["documents"][0][i]
-            metadata = results["metadatas"][0][i]
-            distance = results["distances"][0][i]
+            # Initialize ChromaDB client
+            client = chromadb.PersistentClient(path=args.db_path)
             
-            # Convert distance to similarity score (1 - distance)
-            # ChromaDB uses cosine distance, so similarity = 1 - distance
-            similarity = 1 - distance
+            # Get collection
+            collection = client.get_collection(
+                name=args.collection_name,
+                embedding_function=embedding_function
+            )
             
-            # Add to JSON results
-            json_results.append({
-                "id": document_id,
-                "similarity": similarity,
-                "metadata": metadata,
-                "document": document
-            })
+            logger.info(f"Collection count: {collection.count()}")
             
-            # Log summary
-            logger.info(f"Result {i+1}:")
-            logger.info(f"  ID: {document_id}")
-            logger.info(f"  Similarity: {similarity:.4f}")
-            logger.info(f"  Metadata: {metadata}")
-            logger.info(f"  Document: {document[:200]}...")
+            query_embeddings = embeddings_future.result()
+        
+        # Query the collection, searching all queries in one batch
+        all_results = cached_queries(
+            collection,
+            embedding_function,
+            queries,
+            n_results=args.top_k,
+            query_embeddings=query_embeddings
+        )
+        
+        output = []
+        for query, results in zip(queries, all_results):
+            logger.info(f"Query: '{query}'")
+            output.append({"query": query, "results": format_results(results)})
+        
+        # A single query keeps the plain list of results
+        if not args.queries:
+            output = output[0]["results"]
         
         # Write results to JSON file
         with open(args.output_file, 'w') as f:
-            json.dump(json_results, f, indent=2)
+            json.dump(output, f, indent=2)
         
         logger.info(f"Full results written to {args.output_file}")
     
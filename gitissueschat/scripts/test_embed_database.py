@@ -10,7 +10,7 @@ import os
 import time
 from typing import Dict, Any, Optional
 
-from gitissueschat.scripts.embed_database_to_chromadb import embed_database_to_chromadb
+from gitissueschat.embed.embed_database_to_chromadb import embed_database_to_chromadb
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -18,29 +18,36 @@ logger = logging.getLogger(__name__)
 
 
 def test_embed_database(
+    repo_name: str,
     db_path: str,
     chroma_db_path: str,
     collection_name: str,
     chunk_size: int = 250,
     chunk_overlap: int = 50,
-    batch_size: int = 20,
+    batch_size: int = 200,
     project_id: Optional[str] = None,
     api_key: Optional[str] = None,
-    credentials: Optional[str] = None
+    credentials: Optional[str] = None,
+    num_chunk_workers: Optional[int] = None,
+    num_embed_workers: int = 4
 ) -> Dict[str, Any]:
     """
     Test the embed_database_to_chromadb function on a sample database.
     
     Args:
+        repo_name: Name of the repository to embed.
         db_path: Path to the SQLite database.
         chroma_db_path: Path to the ChromaDB database.
         collection_name: Name of the collection to use.
         chunk_size: Size of chunks in tokens.
         chunk_overlap: Overlap between chunks in tokens.
-        batch_size: Number of chunks to process at once.
+        batch_size: Number of chunks to process at once. Each batch is written to ChromaDB with a
+            single add call; 50-250 amortizes the per-batch overhead best.
         project_id: Google Cloud project ID.
         api_key: Google API key.
         credentials: Path to the Google Cloud service account key file.
+        num_chunk_workers: Number of processes chunking issues. Defaults to the number of CPUs, at most 4.
+        num_embed_workers: Number of threads calling the embedding API concurrently.
         
     Returns:
         Statistics about the database.
@@ -53,7 +60,8 @@ def test_embed_database(
     
     # Process the database
     stats = embed_database_to_chromadb(
-        db_path=db_path,
+        repo_name=repo_name,
+        sqlite_db_path=db_path,
         chroma_db_path=chroma_db_path,
         collection_name=collection_name,
         chunk_size=chunk_size,
@@ -61,7 +69,9 @@ def test_embed_database(
         batch_size=batch_size,
         project_id=project_id,
         api_key=api_key,
-        credentials=credentials
+        credentials_path=credentials,
+        num_chunk_workers=num_chunk_workers,
+        num_embed_workers=num_embed_workers
     )
     
     # End timer
@@ -78,12 +88,16 @@ def test_embed_database(
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="Test embed_database_to_chromadb.py on fastai-issues-sample.db")
+    parser.add_argument("--repo-name", default="fastai/fastai", help="Repository name (e.g., 'username/repo')")
     parser.add_argument("--db-path", default="./fastai-issues-sample.db", help="Path to the SQLite database")
     parser.add_argument("--chroma-db-path", default="./chroma_db_sample", help="Path to the ChromaDB database")
     parser.add_argument("--collection-name", default="fastai_issues_sample", help="Name of the collection to use")
     parser.add_argument("--chunk-size", type=int, default=250, help="Size of chunks in tokens")
     parser.add_argument("--chunk-overlap", type=int, default=50, help="Overlap between chunks in tokens")
-    parser.add_argument("--batch-size", type=int, default=20, help="Number of chunks to process at once")
+    parser.add_argument("--batch-size", type=int, default=200,
+                        help="Number of chunks to process at once (50-250 works best)")
+    parser.add_argument("--num-chunk-workers", type=int, help="Number of processes chunking issues (default: CPU count, at most 4)")
+    parser.add_argument("--num-embed-workers", type=int, default=4, help="Number of concurrent embedding API calls")
     parser.add_argument("--project-id", help="Google Cloud project ID")
     parser.add_argument("--api-key", help="Google API key")
     parser.add_argument("--credentials", help="Path to the Google Cloud service account key file")
@@ -101,6 +115,7 @@ def main():
     
     # Test the function
     test_embed_database(
+        repo_name=args.repo_name,
         db_path=args.db_path,
         chroma_db_path=args.chroma_db_path,
         collection_name=args.collection_name,
@@ -109,7 +124,9 @@ def main():
         batch_size=args.batch_size,
         project_id=project_id,
         api_key=api_key,
-        credentials=credentials
+        credentials=credentials,
+        num_chunk_workers=args.num_chunk_workers,
+        num_embed_workers=args.num_embed_workers
     )
 
 
@@ -6,7 +6,10 @@ This script tests the embedding function directly to ensure it works correctly.
 
 import os
 import logging
-from gitissueschat.embed.google_vertex_embedding_function import GoogleVertexEmbeddingFunctionCustom
+from gitissueschat.embed.google_vertex_embedding_function import (
+    CachedVertexEmbedding,
+    get_embedding_function,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -31,10 +34,10 @@ def main():
     logger.info(f"Testing embedding function with project_id={project_id} and credentials={credentials}")
     
     # Initialize the embedding function
-    embedding_function = GoogleVertexEmbeddingFunctionCustom(
+    embedding_function = CachedVertexEmbedding(get_embedding_function(
         project_id=project_id,
         credentials_path=credentials
-    )
+    ))
     
     # Test texts
     test_texts = [
@@ -8,15 +8,141 @@ import os
 import logging
 import argparse
 import json
+from typing import Any, List, Optional, Tuple
 import numpy as np
 import faiss
 import chromadb
-from gitissueschat.embed.google_vertex_embedding_function import GoogleVertexEmbeddingFunctionCustom
+from gitissueschat.embed.google_vertex_embedding_function import (
+    CachedVertexEmbedding,
+    get_embedding_function,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+def load_embeddings(collection: Any, batch_size: int = 1000) -> Tuple[List[str], np.ndarray]:
+    """
+    Load every embedding in a collection into one preallocated float32 array.
+
+    Embeddings are fetched in batches so the collection is never materialized as one
+    large list of Python lists.
+
+    Args:
+        collection: The ChromaDB collection.
+        batch_size: Number of embeddings to fetch per request.
+
+    Returns:
+        A tuple of the document IDs and an (N, d) float32 array of their embeddings.
+    """
+    count = collection.count()
+    ids = []
+    embeddings = None
+
+    for offset in range(0, count, batch_size):
+        batch = collection.get(limit=batch_size, offset=offset, include=["embeddings"])
+        batch_embeddings = np.asarray(batch["embeddings"], dtype=np.float32)
+        if len(batch_embeddings) == 0:
+            break
+
+        if embeddings is None:
+            embeddings = np.empty((count, batch_embeddings.shape[1]), dtype=np.float32)
+
+        embeddings[len(ids):len(ids) + len(batch_embeddings)] = batch_embeddings
+        ids.extend(batch["ids"])
+
+    if embeddings is None:
+        return [], np.empty((0, 0), dtype=np.float32)
+
+    # Trim in case the collection shrank while reading
+    return ids, embeddings[:len(ids)]
+
+
+def build_index(embeddings: np.ndarray, index_type: str, top_k: int) -> faiss.Index:
+    """
+    Build a FAISS inner-product index over normalized embeddings.
+
+    Args:
+        embeddings: Normalized float32 embeddings, one row per document.
+        index_type: "flat" for exact search, "hnsw" for an HNSW graph, or "ivfpq" for an
+            inverted file with product quantization (for very large collections).
+        top_k: Number of results that will be requested per query.
+
+    Returns:
+        The populated FAISS index.
+    """
+    num_vectors, dimension = embeddings.shape
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dimension)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = max(top_k * 4, 64)
+    elif index_type == "ivfpq":
+        # The quantizers need enough training points; shrink the lists and codebooks for small collections
+        nlist = max(1, min(1024, num_vectors // 39))
+        m = 64 if dimension % 64 == 0 else 1
+        nbits = 8 if num_vectors >= 256 else max(1, num_vectors.bit_length() - 1)
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, m, nbits, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+        index.nprobe = min(nlist, 16)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+
+    index.add(embeddings)
+    return index
+
+
+def load_index(index_path: str) -> Tuple[Optional[faiss.Index], Optional[List[str]], Optional[str]]:
+    """
+    Load a persisted FAISS index, its document IDs and its type, memory-mapping the index
+    where supported.
+    
+    Args:
+        index_path: Path to the FAISS index file. The document IDs are stored next to it.
+        
+    Returns:
+        A tuple of the index, the document IDs and the index type, or (None, None, None)
+        if no index has been saved.
+    """
+    ids_path = f"{index_path}.ids.json"
+    if not (os.path.exists(index_path) and os.path.exists(ids_path)):
+        return None, None, None
+    
+    with open(ids_path, encoding="utf-8") as f:
+        saved = json.load(f)
+    
+    # Files saved before the index type was recorded hold a bare list of IDs
+    if not isinstance(saved, dict):
+        return None, None, None
+    
+    try:
+        index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        # Not every index type can be memory-mapped
+        index = faiss.read_index(index_path)
+    
+    return index, saved["ids"], saved["index_type"]
+
+
+def save_index(index: faiss.Index, ids: List[str], index_type: str, index_path: str) -> None:
+    """
+    Persist a FAISS index, its document IDs and its type.
+    
+    Args:
+        index: The FAISS index.
+        ids: Document IDs, one per indexed vector.
+        index_type: The type the index was built with.
+        index_path: Path to the FAISS index file. The document IDs are stored next to it.
+    """
+    faiss.write_index(index, index_path)
+    with open(f"{index_path}.ids.json", "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "index_type": index_type}, f)
+
+
 def main():
     """
     Main function to test querying ChromaDB using FAISS.
@@ -31,6 +157,10 @@ def main():
                         help="Query to test")
     parser.add_argument("--top-k", type=int, default=5,
                         help="Number of results to return")
+    parser.add_argument("--faiss-index", type=str,
+                        help="Path to a persisted FAISS index; built and saved there if missing or stale")
+    parser.add_argument("--index-type", type=str, default="hnsw", choices=["flat", "hnsw", "ivfpq"],
+                        help="FAISS index type (flat is exact; hnsw and ivfpq are approximate)")
     args = parser.parse_args()
     
     # Get project ID from environment
@@ -49,10 +179,10 @@ def main():
     
     try:
         # Initialize the embedding function
-        embedding_function = GoogleVertexEmbeddingFunctionCustom(
+        embedding_function = CachedVertexEmbedding(get_embedding_function(
             project_id=project_id,
             credentials_path=credentials
-        )
+        ))
         
         # Initialize ChromaDB client
         client = chromadb.PersistentClient(path=args.db_path)
@@ -63,59 +193,93 @@ def main():
             embedding_function=embedding_function
         )
         
-        logger.info(f"Collection count: {collection.count()}")
-        
-        # Get all documents from the collection
-        all_results = collection.get(include=["embeddings", "documents", "metadatas"])
+        collection_count = collection.count()
+        logger.info(f"Collection count: {collection_count}")
         
-        # Check if we have embeddings
-        if "embeddings" not in all_results or not all_results["embeddings"]:
-            logger.error("No embeddings found in the collection")
-            logger.info(f"Available keys in results: {list(all_results.keys())}")
-            logger.info(f"Sample of results: {json.dumps(all_results, indent=2)[:500]}...")
-            return
+        # Reuse the persisted index only if it was built with the requested type over exactly
+        # the documents now in the collection. Updates delete and re-add chunks, so the count
+        # alone can match while the IDs differ.
+        index, ids = (None, None)
+        if args.faiss_index:
+            index, ids, index_type = load_index(args.faiss_index)
+            if index is not None and (
+                index_type != args.index_type
+                or len(ids) != collection_count
+                or set(ids) != set(collection.get(include=[])["ids"])
+            ):
+                logger.info(f"Persisted index at {args.faiss_index} is stale, rebuilding")
+                index, ids = (None, None)
         
-        # Convert embeddings to numpy array
-        embeddings = np.array(all_results["embeddings"])
-        
-        # Create FAISS index
-        dimension = len(embeddings[0])
-        logger.info(f"Embedding dimension: {dimension}")
-        
-        index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
-        
-        # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(embeddings)
-        
-        # Add embeddings to index
-        index.add(embeddings)
+        if index is not None:
+            logger.info(f"Loaded index with {index.ntotal} vectors from {args.faiss_index}")
+            if isinstance(index, faiss.IndexHNSW):
+                index.hnsw.efSearch = max(args.top_k * 4, 64)
+        else:
+            # Load all embeddings from the collection as a contiguous float32 array, the layout FAISS works on directly
+            ids, embeddings = load_embeddings(collection)
+            
+            # Check if we have embeddings
+            if len(ids) == 0:
+                logger.error("No embeddings found in the collection")
+                return
+            
+            dimension = embeddings.shape[1]
+            logger.info(f"Embedding dimension: {dimension}")
+            
+            # Normalize embeddings for cosine similarity
+            faiss.normalize_L2(embeddings)
+            
+            # Create FAISS index (inner product on normalized vectors is cosine similarity)
+            index = build_index(embeddings, args.index_type, args.top_k)
+            logger.info(f"Built {args.index_type} index with {index.ntotal} vectors")
+            
+            if args.faiss_index:
+                save_index(index, ids, args.index_type, args.faiss_index)
+                logger.info(f"Saved index to {args.faiss_index}")
         
         # Generate embedding for query
         query_embedding = embedding_function([args.query])[0]
         
         # Normalize query embedding
-        query_embedding_np = np.array([query_embedding])
+        query_embedding_np = np.asarray([query_embedding], dtype=np.float32)
         faiss.normalize_L2(query_embedding_np)
         
         # Search index
         distances, indices = index.search(query_embedding_np, args.top_k)
         
+        # Fetch documents and metadata for the matches only
+        match_ids = [ids[idx] for idx in indices[0] if idx >= 0]
+        matches = collection.get(ids=match_ids, include=["documents", "metadatas"])
+        documents = dict(zip(matches["ids"], matches["documents"]))
+        metadatas = dict(zip(matches["ids"], matches["metadatas"]))
+        
         # Print results
-        logger.info(f"Query results: {len(indices[0])} matches")
+        logger.info(f"Query results: {len(match_ids)} matches")
         
+        # The loop only logs, so skip it entirely when INFO logging is off
         for i, (idx, distance) in enumerate(zip(indices[0], distances[0])):
+            if not logger.isEnabledFor(logging.INFO):
+                break
+            
+            # Approximate indexes pad with -1 when fewer than top_k results are found
+            if idx < 0:
+                continue
+            
             # Convert distance to similarity (for inner product, higher is better)
             similarity = distance
             
-            # Get document and metadata
-            document = all_results["documents"][idx]
-            metadata = all_results["metadatas"][idx]
+            # Get document and metadata, skipping documents deleted since the index was built
+            document_id = ids[idx]
+            if document_id not in documents:
+                continue
+            document = documents[document_id]
+            metadata = metadatas[document_id]
             
-            logger.info(f"Result {i+1}:")
-            logger.info(f"  ID: {all_results['ids'][idx]}")
-            logger.info(f"  Similarity: {similarity}")
-            logger.info(f"  Metadata: {metadata}")
-            logger.info(f"  Document: {document[:100]}...")
+            logger.info("Result %d:", i + 1)
+            logger.info("  ID: %s", document_id)
+            logger.info("  Similarity: %s", similarity)
+            logger.info("  Metadata: %s", metadata)
+            logger.info("  Document: %s...", document[:100])
     
     except Exception as e:
         logger.error(f"Error querying with FAISS: {e}")
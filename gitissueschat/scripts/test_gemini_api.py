@@ -4,6 +4,11 @@ Simple script to test the Gemini API.
 
 import os
 import logging
+import argparse
+import datetime
+import hashlib
+from functools import lru_cache
+from typing import Optional
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
@@ -11,11 +16,29 @@ from google.generativeai.types import HarmCategory, HarmBlockThreshold
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def test_gemini_api():
-    """Test the Gemini API with a simple question."""
+GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "max_output_tokens": 1024,
+    "top_p": 0.95,
+    "top_k": 40,
+    "response_mime_type": "text/plain"
+}
+
+SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+@lru_cache(maxsize=1)
+def _configure() -> None:
+    """
+    Configure the Gemini API once per process.
+    """
     # Get API key from environment
     api_key = os.environ.get("GOOGLE_API_KEY")
-    
+
     # Configure the Gemini API
     if api_key:
         logger.info("Configuring Gemini API with API key")
@@ -26,49 +49,121 @@ def test_gemini_api():
         if credentials_path:
             logger.info(f"Configuring Gemini API with service account credentials from {credentials_path}")
             import google.auth
-            
+
             # Load credentials from the service account file
-            try:
-                credentials, project_id = google.auth.load_credentials_from_file(credentials_path)
-                genai.configure(credentials=credentials)
-                logger.info(f"Successfully configured Gemini API with service account for project {project_id}")
-            except Exception as e:
-                logger.error(f"Error loading service account credentials: {e}")
-                return
+            credentials, project_id = google.auth.load_credentials_from_file(credentials_path)
+            genai.configure(credentials=credentials)
+            logger.info(f"Successfully configured Gemini API with service account for project {project_id}")
         else:
-            logger.error("Neither API key nor service account credentials provided")
-            return
-    
+            raise ValueError("Neither API key nor service account credentials provided")
+
+@lru_cache(maxsize=4)
+def _get_model(
+    model_name: str,
+    preamble: Optional[str] = None,
+    cache_ttl_seconds: int = 3600
+) -> genai.GenerativeModel:
+    """
+    Create the model once per process.
+
+    When a preamble is given, it is stored as explicit cached content so that every
+    question reuses the cached preamble tokens instead of resending them. The cached
+    content is named after the model and preamble, and later runs reuse it rather than
+    creating another one.
+
+    Args:
+        model_name: Name of the Gemini model to use.
+        preamble: Optional system instruction shared by every question.
+        cache_ttl_seconds: Lifetime of the cached preamble.
+
+    Returns:
+        The configured GenerativeModel.
+    """
+    _configure()
+
+    if preamble:
+        try:
+            digest = hashlib.sha256(f"{model_name}\n{preamble}".encode("utf-8")).hexdigest()[:16]
+            display_name = f"test-gemini-api-preamble-{digest}"
+            ttl = datetime.timedelta(seconds=cache_ttl_seconds)
+            
+            # Cached content is billed while it lives, so reuse this preamble's cache from
+            # an earlier run (extending its lifetime) instead of leaving a new one behind
+            cached_content = next(
+                (c for c in genai.caching.CachedContent.list() if c.display_name == display_name),
+                None
+            )
+            if cached_content is not None:
+                cached_content.update(ttl=ttl)
+                logger.info(f"Reusing cached content {cached_content.name} for the preamble")
+            else:
+                cached_content = genai.caching.CachedContent.create(
+                    model=model_name,
+                    display_name=display_name,
+                    system_instruction=preamble,
+                    ttl=ttl
+                )
+                logger.info(f"Created cached content {cached_content.name} for the preamble")
+            return genai.GenerativeModel.from_cached_content(
+                cached_content,
+                generation_config=GENERATION_CONFIG,
+                safety_settings=SAFETY_SETTINGS
+            )
+        except Exception as e:
+            # e.g. the preamble is below the model's minimum cacheable token count
+            logger.warning(f"Could not cache the preamble, sending it with every request: {e}")
+
     # Initialize the model
-    model_name = "gemini-2.0-flash-001"
-    model = genai.GenerativeModel(
+    return genai.GenerativeModel(
         model_name=model_name,
-        generation_config={
-            "temperature": 0.2,
-            "max_output_tokens": 1024,
-            "top_p": 0.95,
-            "top_k": 40
-        },
-        safety_settings={
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-        }
+        system_instruction=preamble,
+        generation_config=GENERATION_CONFIG,
+        safety_settings=SAFETY_SETTINGS
     )
-    
-    # Test question
-    question = "What is the capital of France?"
-    
-    logger.info(f"Sending question to Gemini API: {question}")
+
+def test_gemini_api(questions=None, preamble=None):
+    """
+    Test the Gemini API with simple questions.
+
+    Args:
+        questions: Questions to ask. Defaults to a single simple question.
+        preamble: Optional system instruction shared by every question.
+    """
     try:
-        response = model.generate_content(question)
-        logger.info(f"Response received: {response.text}")
-        print("\nQuestion:", question)
-        print("\nResponse:", response.text)
+        model = _get_model("gemini-2.0-flash-001", preamble)
     except Exception as e:
-        logger.error(f"Error generating response: {e}")
-        print(f"Error: {e}")
+        logger.error(f"Error configuring Gemini API: {e}")
+        return
+
+    # Test questions
+    questions = questions or ["What is the capital of France?"]
+
+    for question in questions:
+        logger.info(f"Sending question to Gemini API: {question}")
+        try:
+            # Stream the response so text is printed as soon as the first tokens arrive
+            response = model.generate_content(question, stream=True)
+            print("\nQuestion:", question)
+            print("\nResponse: ", end="", flush=True)
+            text_parts = []
+            for chunk in response:
+                text_parts.append(chunk.text)
+                print(chunk.text, end="", flush=True)
+            print()
+            logger.info(f"Response received: {''.join(text_parts)}")
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            print(f"Error: {e}")
 
 if __name__ == "__main__":
-    test_gemini_api()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Test the Gemini API")
+    parser.add_argument("--questions", nargs="+", help="Questions to ask")
+    parser.add_argument("--preamble-file", help="File with a system instruction to cache and share across questions")
+    args = parser.parse_args()
+
+    preamble = None
+    if args.preamble_file:
+        with open(args.preamble_file, encoding="utf-8") as f:
+            preamble = f.read()
+
+    test_gemini_api(args.questions, preamble)
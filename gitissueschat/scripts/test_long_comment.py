@@ -2,86 +2,22 @@
 Test script for chunking a specific issue with long comments.
 """
 
-import sqlite3
 import json
-import tiktoken
-from typing import Dict, List, Any
+from typing import Any
 from gitissueschat.embed.llamaindex_chunker import LlamaIndexChunker
+from gitissueschat.embed.sqlite_loader import get_issue_with_comments
 
-
-def get_issue_with_comments(db_path: str, repo_name: str, issue_number: int) -> Dict[str, Any]:
-    """
-    Retrieve an issue and its comments from the SQLite database.
-    
-    Args:
-        db_path: Path to the SQLite database.
-        repo_name: Repository name in the format 'owner/repo'.
-        issue_number: Issue number to retrieve.
-        
-    Returns:
-        A dictionary containing the issue data with comments.
-    """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    
-    # Get repository ID
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM repositories WHERE name = ?", (repo_name,))
-    repo_row = cursor.fetchone()
-    
-    if not repo_row:
-        raise ValueError(f"Repository {repo_name} not found in database")
-    
-    repo_id = repo_row[0]
-    
-    # Get issue
-    cursor.execute(
-        """
-        SELECT * FROM issues 
-        WHERE repo_id = ? AND number = ?
-        """, 
-        (repo_id, issue_number)
-    )
-    issue_row = cursor.fetchone()
-    
-    if not issue_row:
-        raise ValueError(f"Issue #{issue_number} not found in repository {repo_name}")
-    
-    # Convert to dictionary
-    issue = {key: issue_row[key] for key in issue_row.keys()}
-    issue["repository"] = repo_name
-    
-    # Get comments for the issue
-    cursor.execute(
-        """
-        SELECT * FROM comments 
-        WHERE issue_id = ? 
-        ORDER BY created_at
-        """, 
-        (issue["id"],)
-    )
-    comments = []
-    
-    for row in cursor:
-        comment = {key: row[key] for key in row.keys()}
-        comments.append(comment)
-    
-    # Add comments to the issue
-    issue["comments"] = comments
-    
-    conn.close()
-    
-    return issue
-
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
 def analyze_chunks(chunks, chunker_name):
     """Analyze the token counts of chunks."""
-    tokenizer = tiktoken.get_encoding("cl100k_base")
-    
-    token_counts = []
-    for chunk in chunks:
-        token_count = len(tokenizer.encode(chunk["text"]))
-        token_counts.append(token_count)
+    # Token counts are recorded by the chunker when the chunks are created
+    token_counts = [chunk["n_tokens"] for chunk in chunks]
     
     if token_counts:
         min_tokens = min(token_counts)
@@ -126,17 +62,16 @@ def main():
     for i, comment in enumerate(issue["comments"]):
         print(f"Comment {i+1}: {len(comment['body'])} characters")
     
+    # Initialize one chunker and reuse it for every chunk size
+    chunker = LlamaIndexChunker(chunk_overlap=50, count_tokens=True)
+    
     # Test different chunk sizes
     for chunk_size in [100, 250, 500]:
         print(f"\n=== Testing LlamaIndex chunker with chunk_size={chunk_size} ===")
         
-        # Initialize chunker
-        chunker = LlamaIndexChunker(
-            chunk_size=chunk_size,
-            chunk_overlap=50
-        )
+        chunker.set_chunk_params(chunk_size=chunk_size, chunk_overlap=50)
         
-        # Process the issue
+        # Process the issue (a shallow copy, since the chunker pops the comments list)
         chunks = chunker.process_issue_with_comments(issue.copy())
         
         # Analyze the chunks
@@ -144,9 +79,8 @@ def main():
         
         # Save chunks to file
         output_file = f"issue2769-chunks-{chunk_size}.jsonl"
-        with open(output_file, 'w') as f:
-            for chunk in chunks:
-                f.write(json.dumps(chunk) + '\n')
+        with open(output_file, 'wb', buffering=1 << 20) as f:
+            f.writelines(_json_dumps(chunk) + b'\n' for chunk in chunks)
         
         print(f"Saved {len(chunks)} chunks to {output_file}")
 
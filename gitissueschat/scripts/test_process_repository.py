@@ -6,25 +6,34 @@ This script tests the process_repository.py script with a small repository
 to verify that it works correctly.
 """
 
-import os
+import re
+import asyncio
 import argparse
 import logging
-from dotenv import load_dotenv
 
-from gitissueschat.scripts.process_repository import download_issues, embed_database_to_chromadb, normalize_repo_input
+from gitissueschat.utils.process_repository import (
+    download_issues,
+    normalize_repo_input,
+    normalize_repo_input_batch,
+)
+from gitissueschat.embed.embed_database_to_chromadb import embed_database_to_chromadb_async
 from gitissueschat.utils.db_path_manager import get_sqlite_db_path, get_chroma_db_path
+from gitissueschat.utils.env_config import load_env
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Load environment variables from .env file once per process
+_ENV = load_env()
+
+# Expected 'owner/repo' for each normalize_repo_input test case, compiled once per process
+REPO_PATTERN = re.compile(r'^(?:https?://github\.com/)?([^/]+/[^/.]+)(?:\.git)?/?$')
+
 def main():
     """
     Main function to test the process_repository.py script.
     """
-    # Load environment variables from .env file
-    load_dotenv()
-    
     parser = argparse.ArgumentParser(description="Test the process_repository.py script")
     parser.add_argument("--repository", default="microsoft/vscode-extension-samples", 
                         help="GitHub repository to test with (URL or 'owner/repo' format, default: microsoft/vscode-extension-samples)")
@@ -43,19 +52,19 @@ def main():
         logger.info(f"Using repository: {repo_name}")
         
         # Get GitHub token from environment variable
-        github_token = os.environ.get("GITHUB_TOKEN")
+        github_token = _ENV.github_token
         if not github_token:
             logger.error("GITHUB_TOKEN environment variable not set")
             exit(1)
         
         # Get Google Cloud credentials from environment
-        project_id = os.environ.get("GOOGLE_PROJECT_ID")
+        project_id = _ENV.project_id
         if not project_id:
             logger.error("GOOGLE_PROJECT_ID environment variable not set")
             exit(1)
         
-        api_key = os.environ.get("GOOGLE_API_KEY")
-        credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+        api_key = _ENV.api_key
+        credentials_path = _ENV.credentials_path
         
         # Get database paths
         sqlite_db_path = get_sqlite_db_path(repo_name)
@@ -70,8 +79,9 @@ def main():
         
         # Step 2: Chunk and embed issues
         logger.info(f"Processing issues into chunks and embedding them")
-        stats = embed_database_to_chromadb(
+        stats = asyncio.run(embed_database_to_chromadb_async(
             repo_name=repo_name,
+            num_embed_workers=4,
             sqlite_db_path=sqlite_db_path,
             chroma_db_path=chroma_db_path,
             collection_name="github_issues",
@@ -82,7 +92,7 @@ def main():
             api_key=api_key,
             credentials_path=credentials_path,
             limit_issues=args.max_issues
-        )
+        ))
         
         logger.info(f"Database statistics: {stats}")
         logger.info(f"Test completed successfully")
@@ -103,13 +113,22 @@ def main():
     if args.repository:
         test_cases.append(args.repository)
 
-    # Test normalize_repo_input with each test case
-    for test_case in test_cases:
-        try:
-            normalized_repo = normalize_repo_input(test_case)
-            logger.info(f"Input: {test_case} -> Normalized: {normalized_repo}")
-        except ValueError as e:
-            logger.error(f"Error normalizing {test_case}: {e}")
+    # Test normalize_repo_input against the expected names in one pass
+    expected = [REPO_PATTERN.match(test_case) for test_case in test_cases]
+    expected = [match.group(1) if match else None for match in expected]
+    normalized = normalize_repo_input_batch(test_cases)
+    
+    mismatches = [
+        (test_case, result, want)
+        for test_case, result, want in zip(test_cases, normalized, expected)
+        if want is not None and result != want
+    ]
+    
+    logger.info("normalize_repo_input results:\n" + "\n".join(
+        f"  {test_case} -> {result}" for test_case, result in zip(test_cases, normalized)
+    ))
+    for test_case, result, want in mismatches:
+        logger.error(f"Error normalizing {test_case}: got {result}, expected {want}")
 
 if __name__ == "__main__":
     main()
@@ -6,15 +6,81 @@ This script tests the RAG system with a sample query.
 
 import argparse
 import logging
-import os
 import sys
+from typing import Dict, Any, Tuple
 
 from gitissueschat.rag.rag_orchestrator import RAGOrchestrator
+from gitissueschat.embed.semantic_cache import SemanticQueryCache
+from gitissueschat.utils.env_config import load_env
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Load environment variables from .env file once per process
+_ENV = load_env()
+
+
+def response_cache_key(orchestrator: RAGOrchestrator) -> Tuple:
+    """
+    Get the settings a cached response depends on, which must match for it to be reused.
+    
+    Args:
+        orchestrator: The RAG orchestrator.
+        
+    Returns:
+        The collection's ID (unique per database path), name and document count, the
+        retrieval settings and the model name.
+    """
+    retriever = orchestrator.retriever
+    collection = retriever.db.get_collection()
+    return (
+        str(collection.id),
+        collection.name,
+        # Changes when chunks are added or removed, which invalidates earlier answers
+        collection.count(),
+        retriever.top_k,
+        retriever.relevance_threshold,
+        orchestrator.generator.model_name,
+    )
+
+
+def cached_process_query(
+    orchestrator: RAGOrchestrator,
+    query: str,
+    cache_path: str,
+    threshold: float = 0.95
+) -> Dict[str, Any]:
+    """
+    Answer a query, reusing the stored answer to a semantically identical earlier query.
+    
+    Args:
+        orchestrator: The RAG orchestrator.
+        query: Query text.
+        cache_path: Path prefix of the on-disk response cache.
+        threshold: Minimum cosine similarity for a cached query to count as a hit.
+        
+    Returns:
+        Dictionary with the response, the chunks it was based on, and whether it was cached.
+    """
+    cache = SemanticQueryCache.load(cache_path, threshold=threshold)
+    
+    # Embed the query with the same embedding function the retriever uses
+    query_embedding = orchestrator.retriever.db.embedding_function([query])[0]
+    
+    # Answers from another database, collection or model must not be reused
+    key = response_cache_key(orchestrator)
+    
+    result = cache.lookup(query_embedding, key)
+    if result is not None:
+        return {**result, "cached": True}
+    
+    result = orchestrator.process_query_with_chunks(query)
+    cache.add(query_embedding, result, key)
+    cache.save(cache_path)
+    
+    return {**result, "cached": False}
+
 
 def main():
     """
@@ -30,20 +96,27 @@ def main():
                         help="Query to test")
     parser.add_argument("--api-key", type=str, default=None,
                         help="Google API key (if not provided, will try to get from environment)")
+    parser.add_argument("--cache-path", type=str, default="./data/rag_response_cache",
+                        help="Path prefix of the semantic response cache")
+    parser.add_argument("--cache-threshold", type=float, default=0.95,
+                        help="Minimum cosine similarity for a cached response to be reused")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse answers to semantically identical earlier queries; they are "
+                             "not refreshed when chunks are re-embedded without changing the count")
     args = parser.parse_args()
     
     # Get API key from arguments or environment
-    api_key = args.api_key or os.environ.get("GOOGLE_API_KEY")
+    api_key = args.api_key or _ENV.api_key
     if not api_key:
         logger.error("API key not provided and GOOGLE_API_KEY environment variable not set")
         logger.error("Please provide an API key with --api-key or set the GOOGLE_API_KEY environment variable")
         sys.exit(1)
     
     # Get project ID from environment
-    project_id = os.environ.get("GOOGLE_CLOUD_PROJECT") or os.environ.get("GOOGLE_PROJECT_ID")
+    project_id = _ENV.project_id
     
     # Get credentials from environment
-    credentials = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    credentials = _ENV.credentials_path
     
     logger.info(f"Testing RAG system with query: {args.query}")
     
@@ -53,19 +126,22 @@ def main():
         collection_name=args.collection_name,
         project_id=project_id,
         api_key=api_key,
-        credentials=credentials,
+        credentials_path=credentials,
         top_k=10,
         relevance_threshold=0.75
     )
     
     # Process the query
-    result = orchestrator.process_query(args.query)
+    if args.cache:
+        result = cached_process_query(orchestrator, args.query, args.cache_path, args.cache_threshold)
+    else:
+        result = {**orchestrator.process_query_with_chunks(args.query), "cached": False}
     
     # Print the results
     print("\n" + "="*80)
     print(f"QUERY: {args.query}")
     print("="*80)
-    print(f"RESPONSE: (based on {result['num_chunks']} chunks)")
+    print(f"RESPONSE: (based on {result['num_chunks']} chunks{', cached' if result['cached'] else ''})")
     print("-"*80)
     print(result["response"])
     print("="*80)
@@ -75,7 +151,7 @@ def main():
     for i, chunk in enumerate(result["chunks"]):
         print(f"\nChunk {i+1} (Similarity: {chunk['similarity']:.4f}):")
         print(f"Metadata: {chunk['metadata']}")
-        print(f"Text: {chunk['document'][:100]}...")
+        print(f"Text: {chunk['content'][:100]}...")
     
     logger.info("Test completed")
 
@@ -8,32 +8,174 @@ to send to the LLM, and the final LLM output.
 """
 
 import argparse
+import asyncio
 import logging
-import os
+import io
 import sys
 import json
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Any
-from dotenv import load_dotenv
 
 from gitissueschat.rag.rag_orchestrator import RAGOrchestrator
 from gitissueschat.rag.gemini_generator import GeminiGenerator
+from gitissueschat.utils.env_config import load_env
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Load environment variables from temp.env file once per process
+_DOTENV_PATH = Path(__file__).resolve().parents[2] / "temp.env"
+_DOTENV_FOUND = _DOTENV_PATH.exists()
+_ENV = load_env(_DOTENV_PATH if _DOTENV_FOUND else None)
+
+
+async def run_steps(orchestrator: RAGOrchestrator, query: str, relevance_threshold: float) -> None:
+    """
+    Run and print each step of the RAG process.
+    
+    Generation and prompt building start as soon as the chunks are retrieved, so the
+    LLM call and the context/prompt assembly run while the chunks are being printed.
+    
+    Args:
+        orchestrator: The RAG orchestrator.
+        query: Query text.
+        relevance_threshold: Minimum relevance score used by the retriever (for display).
+    """
+    # Step 1: Retrieve relevant chunks
+    print("\n" + "="*80)
+    print(f"QUERY: {query}")
+    print("="*80)
+    
+    print("\nSTEP 1: RETRIEVING RELEVANT CHUNKS")
+    print("-"*80)
+    
+    # Format detailed information about each chunk as it arrives, buffered into a single write
+    encoder = json.JSONEncoder(indent=2)
+    buf = io.StringIO()
+    chunks = []
+    async for chunk in orchestrator.retrieve_stream(query):
+        chunks.append(chunk)
+        buf.write(f"\nCHUNK {len(chunks)}:\n")
+        buf.write(f"  Similarity Score: {chunk['similarity']:.4f}\n")
+        buf.write(f"  ID: {chunk['id']}\n")
+        buf.write(f"  Metadata: {encoder.encode(chunk['metadata'])}\n")
+        buf.write(f"  Content Preview: {chunk['content'][:150]}...\n")
+    
+    # Start generating the response in the background
+    generator = orchestrator.generator
+    generation = asyncio.create_task(asyncio.to_thread(generator.generate, query, chunks))
+    
+    # Build the context and prompt for display in the background too; the prompt
+    # depends on the context, so both run in one worker
+    def build_prompt():
+        formatted_context = generator._format_context(chunks)
+        return formatted_context, generator._create_prompt(query, formatted_context)
+    
+    prompt_building = asyncio.create_task(asyncio.to_thread(build_prompt))
+    
+    print(f"Retrieved {len(chunks)} chunks with similarity >= {relevance_threshold}")
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
+    
+    # Step 2: Format context for the LLM
+    print("\n" + "="*80)
+    print("STEP 2: FORMATTING CONTEXT FOR THE LLM")
+    print("-"*80)
+    formatted_context, prompt = await prompt_building
+    print(formatted_context)
+    
+    # Step 3: Create the prompt
+    print("\n" + "="*80)
+    print("STEP 3: CREATING THE PROMPT")
+    print("-"*80)
+    print(prompt)
+    
+    # Step 4: Generate the response
+    print("\n" + "="*80)
+    print("STEP 4: GENERATING THE RESPONSE")
+    print("-"*80)
+    response = await generation
+    print(response)
+
+
+@lru_cache(maxsize=4)
+def get_orchestrator(
+    db_path: str,
+    collection_name: str,
+    project_id: str,
+    credentials_path: str,
+    model_name: str,
+    temperature: float,
+    top_k: int,
+    relevance_threshold: float
+) -> RAGOrchestrator:
+    """
+    Create a RAG orchestrator, reusing an existing one for the same settings.
+    
+    Returns:
+        The RAG orchestrator.
+    """
+    return RAGOrchestrator(
+        db_path=db_path,
+        collection_name=collection_name,
+        project_id=project_id,
+        api_key=None,  # We're using service account credentials instead
+        credentials_path=credentials_path,
+        top_k=top_k,
+        relevance_threshold=relevance_threshold,
+        model_name=model_name,
+        temperature=temperature
+    )
+
+
+def run(
+    query: str,
+    db_path: str,
+    collection_name: str,
+    project_id: str,
+    credentials_path: str,
+    model_name: str = "gemini-2.0-flash-001",
+    temperature: float = 0.2,
+    top_k: int = 10,
+    relevance_threshold: float = 0.5
+) -> None:
+    """
+    Run the detailed RAG test for one query. Repeated calls with the same settings
+    reuse the orchestrator, so only the first call pays its initialization cost.
+    
+    Args:
+        query: Query text.
+        db_path: Path to the ChromaDB database.
+        collection_name: Name of the ChromaDB collection.
+        project_id: Google Cloud project ID.
+        credentials_path: Path to the Google Cloud service account key file.
+        model_name: Name of the Gemini model to use.
+        temperature: Temperature for generation.
+        top_k: Number of chunks to retrieve.
+        relevance_threshold: Minimum relevance score for chunks to be included.
+    """
+    orchestrator = get_orchestrator(
+        db_path, collection_name, project_id, credentials_path,
+        model_name, temperature, top_k, relevance_threshold
+    )
+    
+    asyncio.run(run_steps(orchestrator, query, relevance_threshold))
+    
+    print("\n" + "="*80)
+    print("RAG PROCESS COMPLETED SUCCESSFULLY")
+    print("="*80)
+
 
 def main():
     """
     Main function to test the RAG system with detailed output.
     """
-    # Load environment variables from temp.env file
-    dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "temp.env")
-    if os.path.exists(dotenv_path):
-        load_dotenv(dotenv_path)
-        logger.info(f"Loaded environment variables from {dotenv_path}")
+    if _DOTENV_FOUND:
+        logger.info(f"Loaded environment variables from {_DOTENV_PATH}")
     else:
-        logger.warning(f"Environment file {dotenv_path} not found")
+        logger.warning(f"Environment file {_DOTENV_PATH} not found")
     
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Test the RAG system with detailed output")
@@ -54,13 +196,13 @@ def main():
     args = parser.parse_args()
     
     # Get project ID from environment
-    project_id = os.environ.get("GOOGLE_PROJECT_ID")
+    project_id = _ENV.project_id
     if not project_id:
         logger.error("GOOGLE_PROJECT_ID environment variable not set")
         sys.exit(1)
     
     # Get credentials from environment
-    credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    credentials_path = _ENV.credentials_path
     if not credentials_path:
         logger.error("GOOGLE_APPLICATION_CREDENTIALS environment variable not set")
         logger.error("Please set the GOOGLE_APPLICATION_CREDENTIALS environment variable to the path of your service account key file")
@@ -71,63 +213,18 @@ def main():
     logger.info(f"Project ID: {project_id}")
     
     try:
-        # Initialize the RAG orchestrator
-        orchestrator = RAGOrchestrator(
+        run(
+            args.query,
             db_path=args.db_path,
             collection_name=args.collection_name,
             project_id=project_id,
-            api_key=None,  # We're using service account credentials instead
             credentials_path=credentials_path,
-            top_k=args.top_k,
-            relevance_threshold=args.relevance_threshold,
             model_name=args.model,
-            temperature=args.temperature
+            temperature=args.temperature,
+            top_k=args.top_k,
+            relevance_threshold=args.relevance_threshold
         )
         
-        # Step 1: Retrieve relevant chunks
-        print("\n" + "="*80)
-        print(f"QUERY: {args.query}")
-        print("="*80)
-        
-        print("\nSTEP 1: RETRIEVING RELEVANT CHUNKS")
-        print("-"*80)
-        chunks = orchestrator.retriever.retrieve(args.query)
-        
-        print(f"Retrieved {len(chunks)} chunks with similarity >= {args.relevance_threshold}")
-        
-        # Print detailed information about each chunk
-        for i, chunk in enumerate(chunks):
-            print(f"\nCHUNK {i+1}:")
-            print(f"  Similarity Score: {chunk['similarity']:.4f}")
-            print(f"  ID: {chunk['id']}")
-            print(f"  Metadata: {json.dumps(chunk['metadata'], indent=2)}")
-            print(f"  Content Preview: {chunk['content'][:150]}...")
-        
-        # Step 2: Format context for the LLM
-        print("\n" + "="*80)
-        print("STEP 2: FORMATTING CONTEXT FOR THE LLM")
-        print("-"*80)
-        formatted_context = orchestrator.generator._format_context(chunks)
-        print(formatted_context)
-        
-        # Step 3: Create the prompt
-        print("\n" + "="*80)
-        print("STEP 3: CREATING THE PROMPT")
-        print("-"*80)
-        prompt = orchestrator.generator._create_prompt(args.query, formatted_context)
-        print(prompt)
-        
-        # Step 4: Generate the response
-        print("\n" + "="*80)
-        print("STEP 4: GENERATING THE RESPONSE")
-        print("-"*80)
-        response = orchestrator.generator.generate(args.query, chunks)
-        print(response)
-        
-        print("\n" + "="*80)
-        print("RAG PROCESS COMPLETED SUCCESSFULLY")
-        print("="*80)
-        
     except Exception as e:
         logger.error(f"Error: {e}")
         import traceback
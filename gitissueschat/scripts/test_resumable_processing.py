@@ -12,12 +12,11 @@ Usage:
 """
 
 import os
+import asyncio
 import argparse
 import logging
 import sys
 import time
-import signal
-from dotenv import load_dotenv
 
 # Add the parent directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -25,24 +24,27 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from gitissueschat.utils.process_repository import (
     normalize_repo_input,
     download_issues,
-    embed_database_to_chromadb,
     analyze_repository_data,
     get_sqlite_db_path,
     get_chroma_db_path
 )
+from gitissueschat.embed.embed_database_to_chromadb import embed_database_to_chromadb_async
+from gitissueschat.utils.env_config import load_env
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Load environment variables from .env file once per process
+_ENV = load_env()
+
 # Global variable to track the number of issues processed
 issues_processed = 0
 max_issues_first_run = 10  # Process only 10 issues in the first run
 
-def signal_handler(sig, frame):
-    """Handle interrupt signals to simulate an interruption."""
-    logger.info(f"Process interrupted after processing {issues_processed} issues")
-    sys.exit(0)
+class BatchLimitReached(Exception):
+    """Raised from the batch callback to simulate an interruption."""
+    pass
 
 def process_batch_callback(batch_issues, batch_stats):
     """Callback function to track the number of issues processed and simulate an interruption."""
@@ -52,14 +54,10 @@ def process_batch_callback(batch_issues, batch_stats):
     
     # Simulate an interruption after processing a certain number of issues
     if issues_processed >= max_issues_first_run:
-        logger.info(f"Simulating interruption after processing {issues_processed} issues")
-        os.kill(os.getpid(), signal.SIGINT)
+        raise BatchLimitReached(issues_processed)
 
 def main():
     """Main function to test resumable processing."""
-    # Load environment variables from .env file
-    load_dotenv()
-    
     parser = argparse.ArgumentParser(description="Test resumable processing of a GitHub repository")
     parser.add_argument("repository", help="GitHub repository (URL or 'owner/repo' format)")
     parser.add_argument("--token", help="GitHub API token (or set GITHUB_TOKEN env var)")
@@ -72,19 +70,19 @@ def main():
         logger.info(f"Using repository: {repo_name}")
         
         # Get GitHub token from args or environment variable
-        github_token = args.token or os.environ.get("GITHUB_TOKEN")
+        github_token = args.token or _ENV.github_token
         if not github_token:
             logger.error("GitHub token is required. Provide it with --token or set GITHUB_TOKEN environment variable.")
             sys.exit(1)
         
         # Get Google Cloud credentials from environment
-        project_id = os.environ.get("GOOGLE_PROJECT_ID")
+        project_id = _ENV.project_id
         if not project_id:
             logger.error("GOOGLE_PROJECT_ID environment variable not set")
             sys.exit(1)
         
-        api_key = os.environ.get("GOOGLE_API_KEY")
-        credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+        api_key = _ENV.api_key
+        credentials_path = _ENV.credentials_path
         
         # Get database paths
         sqlite_db_path = get_sqlite_db_path(repo_name)
@@ -100,8 +98,9 @@ def main():
             
             # Process issues into chunks and embed them
             logger.info(f"Processing issues into chunks and embedding them")
-            stats = embed_database_to_chromadb(
+            stats = asyncio.run(embed_database_to_chromadb_async(
                 repo_name=repo_name,
+                num_embed_workers=4,
                 sqlite_db_path=sqlite_db_path,
                 chroma_db_path=chroma_db_path,
                 collection_name="github_issues",
@@ -112,7 +111,7 @@ def main():
                 api_key=api_key,
                 credentials_path=credentials_path,
                 resume=True
-            )
+            ))
             
             logger.info(f"Database statistics: {stats}")
             logger.info(f"Repository processing complete: {repo_name}")
@@ -125,9 +124,6 @@ def main():
                 logger.info(f"  {key}: {value}")
         else:
             logger.info("Starting initial processing (will be interrupted after 10 issues)")
-            # Set up the signal handler to catch the interrupt
-            signal.signal(signal.SIGINT, signal_handler)
-            
             # Start downloading issues with a custom callback
             from gitissueschat.github_issues import GitHubIssuesFetcher
             from gitissueschat.sqlite_storage.sqlite_storage import SQLiteIssueStorage
@@ -139,20 +135,24 @@ def main():
             storage = SQLiteIssueStorage(sqlite_db_path)
             
             # Get existing issue numbers
-            existing_issue_numbers = set(storage.get_issue_numbers(repo_name))
+            existing_issue_numbers = storage.get_issue_number_set(repo_name)
             
             # Fetch issues with batch processing and our custom callback
-            fetcher.fetch_issues(
-                repo_name=repo_name,
-                state="all",
-                include_comments=True,
-                existing_issue_numbers=existing_issue_numbers,
-                batch_size=5,  # Smaller batch size for demonstration
-                batch_callback=process_batch_callback
-            )
-            
-            # This code will not be reached due to the interrupt
-            logger.info("This line should not be printed")
+            try:
+                fetcher.fetch_issues(
+                    repo_name=repo_name,
+                    state="all",
+                    include_comments=True,
+                    existing_issue_numbers=existing_issue_numbers,
+                    batch_size=5,  # Smaller batch size for demonstration
+                    batch_callback=process_batch_callback
+                )
+                
+                # This code will not be reached due to the interruption
+                logger.info("This line should not be printed")
+            except BatchLimitReached as e:
+                logger.info(f"Simulating interruption after processing {e.args[0]} issues")
+                logger.info("Run the script again with --resume to continue from where it left off")
     
     except ValueError as e:
         logger.error(str(e))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test SQLite Storage Script
+
+This script tests that reads through the read-only connection pool see the data
+written by SQLiteIssueStorage, for database paths that are not plain file names, that
+store_issues skips batches not updated since the last API call, and that per-thread
+connections are closed once their threads exit.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from gitissueschat.sqlite_storage.connection_manager import SQLiteConnectionManager
+from gitissueschat.sqlite_storage.sqlite_storage import SQLiteIssueStorage
+
+
+def make_issue(number):
+    """Build a minimal GitHub issue with one comment."""
+    return {
+        "id": number * 100,
+        "number": number,
+        "title": f"Issue {number}",
+        "body": "Body",
+        "state": "open",
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-02T00:00:00Z",
+        "user": {"login": "author"},
+        "html_url": f"https://github.com/owner/repo/issues/{number}",
+        "labels": [{"name": "bug"}],
+        "comments": [
+            {
+                "id": number * 1000,
+                "body": "Comment",
+                "user": {"login": "commenter"},
+                "created_at": "2024-01-01T12:00:00Z",
+                "updated_at": "2024-01-01T12:00:00Z",
+            }
+        ],
+    }
+
+
+class TestSQLiteStorageReads(unittest.TestCase):
+    """Reads after a store must see the stored issues."""
+
+    def assert_round_trip(self, db_path):
+        storage = SQLiteIssueStorage(db_path)
+        try:
+            result = storage.store_issues([make_issue(1), make_issue(2)], "owner/repo")
+            self.assertEqual(result["new_count"], 2)
+
+            self.assertEqual(storage.get_issue_count("owner/repo"), 2)
+            self.assertEqual(storage.get_issue_number_set("owner/repo"), {1, 2})
+            issues = storage.get_issues("owner/repo")
+            self.assertEqual(sorted(issue["number"] for issue in issues), [1, 2])
+        finally:
+            storage.close()
+
+    def test_in_memory_database(self):
+        """An in-memory database is read through the connection that wrote it."""
+        self.assert_round_trip(":memory:")
+
+    def test_path_with_uri_characters(self):
+        """Characters with a meaning in URIs don't make reads open a different file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ("issues#1.db", "issues?mode=rw.db", "issues%20.db"):
+                with self.subTest(name=name):
+                    self.assert_round_trip(os.path.join(temp_dir, name))
+
+
+class TestStoreIssuesShortCircuit(unittest.TestCase):
+    """Batches not updated since the last API call are counted as redundant up front."""
+
+    def test_skip_within_the_same_day(self):
+        """GitHub timestamps compare correctly with API log timestamps from the same day."""
+        storage = SQLiteIssueStorage(":memory:")
+        try:
+            storage.store_issues([make_issue(1), make_issue(2)], "owner/repo")
+            storage.log_api_call("owner/repo")
+            conn = storage.connection_manager.get_connection()
+            with conn:
+                conn.execute("UPDATE api_logs SET timestamp = '2024-01-02 00:05:00'")
+
+            # Updated after they were stored but before the last API call, on the same day:
+            # only the short-circuit counts these as redundant rather than updated
+            issues = [make_issue(1), make_issue(2)]
+            for issue in issues:
+                issue["updated_at"] = "2024-01-02T00:01:00Z"
+            result = storage.store_issues(issues, "owner/repo")
+
+            self.assertEqual(result["redundant_count"], 2)
+            self.assertEqual(result["updated_count"], 0)
+        finally:
+            storage.close()
+
+
+class TestConnectionCleanup(unittest.TestCase):
+    """Connections of threads that have exited must not stay open."""
+
+    def test_exited_thread_connections_are_closed(self):
+        """Opening a connection closes the ones left behind by finished threads."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = SQLiteConnectionManager(os.path.join(temp_dir, "issues.db"))
+            try:
+                thread_connections = []
+
+                def open_connection():
+                    thread_connections.append(manager.get_connection())
+
+                for _ in range(10):
+                    thread = threading.Thread(target=open_connection)
+                    thread.start()
+                    thread.join()
+
+                manager.get_connection()
+
+                self.assertEqual(len(manager._connections), 1)
+                for conn in thread_connections:
+                    with self.assertRaises(sqlite3.ProgrammingError):
+                        conn.execute("SELECT 1")
+            finally:
+                manager.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
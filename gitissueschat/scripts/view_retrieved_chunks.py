@@ -3,6 +3,7 @@ Script to view retrieved chunks from ChromaDB without using Gemini API.
 """
 
 import os
+import sys
 import json
 import logging
 import argparse
@@ -10,10 +11,22 @@ from typing import Dict, List, Any, Optional
 
 from gitissueschat.embed.chroma_database import ChunksDatabase
 
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Separator line between the sections of a formatted chunk
+_SEP = "=" * 80
+
 def parse_args():
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(description="View retrieved chunks from ChromaDB")
@@ -35,7 +48,7 @@ def parse_args():
 def format_chunk(i: int, chunk: Dict[str, Any]) -> str:
     """Format a chunk for display."""
     # Format metadata
-    metadata_str = json.dumps(chunk.get("metadata", {}), indent=2)
+    metadata_str = _json_dumps(chunk.get("metadata", {})).decode("utf-8")
     
     # Format content
     content = chunk.get("document", "")
@@ -43,16 +56,18 @@ def format_chunk(i: int, chunk: Dict[str, Any]) -> str:
     # Format similarity
     similarity = chunk.get("similarity", 0.0)
     
-    return f"""
-CHUNK {i+1} [similarity: {similarity:.4f}]
-{'=' * 80}
-METADATA:
-{metadata_str}
-{'=' * 80}
-CONTENT:
-{content}
-{'=' * 80}
-"""
+    return "\n".join((
+        "",
+        f"CHUNK {i+1} [similarity: {similarity:.4f}]",
+        _SEP,
+        "METADATA:",
+        metadata_str,
+        _SEP,
+        "CONTENT:",
+        content,
+        _SEP,
+        ""
+    ))
 
 def main():
     """Main entry point."""
@@ -96,34 +111,29 @@ def main():
             
             print(f"\nFound {len(ids)} chunks for query: '{args.query}'")
             
-            # Format and display chunks
-            for i in range(len(ids)):
-                # Convert distance to similarity score (1 - distance)
-                similarity = 1 - distances[i]
-                
-                chunk = {
-                    "id": ids[i],
-                    "document": documents[i],
-                    "metadata": metadatas[i],
-                    "similarity": similarity
+            # Pair up the parallel result lists once, for both display and saving
+            chunks = [
+                {
+                    "id": chunk_id,
+                    "document": document,
+                    "metadata": metadata,
+                    # Convert distance to similarity score (1 - distance)
+                    "similarity": 1 - distance
                 }
-                
-                print(format_chunk(i, chunk))
+                for chunk_id, document, metadata, distance in zip(ids, documents, metadatas, distances)
+            ]
+            
+            # Format and display chunks with a single write
+            sys.stdout.write("".join(format_chunk(i, chunk) + "\n" for i, chunk in enumerate(chunks)))
+            sys.stdout.flush()
                 
             # Save results to file
             output_file = "retrieved_chunks.json"
-            with open(output_file, "w") as f:
-                json.dump({
+            with open(output_file, "wb") as f:
+                f.write(_json_dumps({
                     "query": args.query,
-                    "chunks": [
-                        {
-                            "id": ids[i],
-                            "document": documents[i],
-                            "metadata": metadatas[i],
-                            "similarity": 1 - distances[i]
-                        } for i in range(len(ids))
-                    ]
-                }, f, indent=2)
+                    "chunks": chunks
+                }))
             
             logger.info(f"Saved results to {output_file}")
         else:
@@ -47,6 +47,11 @@ class APILogManager:
             )
         """)
         
+        # Index the per-repository log lookups, which filter on repo_id and sort by timestamp
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_api_logs_repo_ts ON api_logs(repo_id, timestamp DESC)"
+        )
+        
         conn.commit()
 
     def log_api_call(
@@ -106,6 +111,62 @@ class APILogManager:
 
             return cursor.lastrowid
 
+    def log_api_calls_bulk(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Log many API calls in a single transaction.
+
+        Args:
+            entries: API call logs, each a dictionary with the keyword arguments of
+                log_api_call (repo_name is required, the counts are optional).
+        """
+        if not entries:
+            return
+
+        conn = self.connection_manager.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Create the missing repositories, then resolve every repository ID with one
+            # query per batch of names
+            repo_names = list({entry["repo_name"] for entry in entries})
+            conn.executemany(
+                "INSERT OR IGNORE INTO repositories (name, added_at) VALUES (?, datetime('now'))",
+                [(name,) for name in repo_names],
+            )
+            repo_ids = {}
+            for batch in self.connection_manager.chunked(repo_names):
+                placeholders = ", ".join("?" * len(batch))
+                query = f"SELECT id, name FROM repositories WHERE name IN ({placeholders})"
+                repo_ids.update((name, repo_id) for repo_id, name in conn.execute(query, batch))
+
+            conn.executemany(
+                """
+                INSERT INTO api_logs (
+                    repo_id, new_issues_count, updated_issues_count, redundant_issues_count,
+                    issues_before_count, issues_after_count,
+                    api_rate_limit_remaining, api_rate_limit_total, execution_time_seconds
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        repo_ids[entry["repo_name"]],
+                        entry.get("new_issues_count", 0),
+                        entry.get("updated_issues_count", 0),
+                        entry.get("redundant_issues_count", 0),
+                        entry.get("issues_before_count", 0),
+                        entry.get("issues_after_count", 0),
+                        entry.get("api_rate_limit_remaining"),
+                        entry.get("api_rate_limit_total"),
+                        entry.get("execution_time_seconds"),
+                    )
+                    for entry in entries
+                ],
+            )
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
     def get_api_logs(self, repo_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get API logs for a repository.
@@ -122,18 +183,15 @@ class APILogManager:
             return []
 
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
-
-            query = "SELECT * FROM api_logs WHERE repo_id = ? ORDER BY timestamp DESC"
-            params = [repo_id]
-
-            if limit:
-                query += " LIMIT ?"
-                params.append(limit)
+            cursor = self.connection_manager.dict_cursor(conn)
 
-            cursor.execute(query, params)
+            # One statement text for both cases keeps it in the statement cache; LIMIT -1 means no limit
+            cursor.execute(
+                "SELECT * FROM api_logs WHERE repo_id = ? ORDER BY timestamp DESC LIMIT ?",
+                (repo_id, limit if limit else -1),
+            )
 
-            return [dict(row) for row in cursor.fetchall()]
+            return cursor.fetchall()
 
     def has_api_call_log(self, repo_name: str, timestamp: str) -> bool:
         """
@@ -151,11 +209,12 @@ class APILogManager:
             return False
 
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self.connection_manager.scalar_cursor(conn)
 
+            # EXISTS stops at the first match found through idx_api_logs_repo_ts
             cursor.execute(
-                "SELECT COUNT(*) FROM api_logs WHERE repo_id = ? AND timestamp = ?",
+                "SELECT EXISTS(SELECT 1 FROM api_logs WHERE repo_id = ? AND timestamp = ?)",
                 (repo_id, timestamp),
             )
 
-            return cursor.fetchone()[0] > 0
+            return bool(cursor.fetchone()[0])
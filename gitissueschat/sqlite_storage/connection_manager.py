@@ -4,136 +4,437 @@ SQLite Connection Manager
 This module provides a class for managing SQLite database connections.
 """
 
+import datetime
+import pathlib
+import queue
+import re
 import sqlite3
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Timezone suffixes stripped from timestamps, compiled once per process
+_TZ_Z = re.compile(r"Z$")
+_TZ_OFF = re.compile(r"[+-]\d{2}:\d{2}$")
+# GitHub's usual 'YYYY-MM-DDTHH:MM:SS[.fff]Z' format, which can be converted by slicing
+_FAST = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z$")
+
+# Stored in PRAGMA user_version once the tables exist; bump it whenever _create_tables changes
+_SCHEMA_VERSION = 3
+# Serializes schema creation between managers created concurrently in this process
+_SCHEMA_LOCK = threading.Lock()
+
+# Database files already switched to WAL by this process. The journal mode is stored in
+# the file, so it only needs to be set once per database, however many managers use it.
+# WAL needs a local file system: it relies on shared memory, which network file systems
+# do not provide.
+_WAL_DATABASES = set()
+
+# Prepared statements kept per connection. The batched IN (...) queries compile one
+# statement per batch size, which would otherwise evict the fixed ones from the default 128
+_CACHED_STATEMENTS = 512
+
+# Values bound per IN (...) query; older SQLite builds allow at most 999 parameters per statement
+_MAX_IN_PARAMS = 900
+
+# All tables and indexes, created in one transaction and stamped with _SCHEMA_VERSION
+_SCHEMA_SQL = f"""
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS repositories (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE,
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS issues (
+    id INTEGER PRIMARY KEY,
+    repo_id INTEGER,
+    number INTEGER,
+    title TEXT,
+    body TEXT,
+    state TEXT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    closed_at TIMESTAMP,
+    author TEXT,
+    html_url TEXT,
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    comment_count INTEGER DEFAULT 0,
+    FOREIGN KEY (repo_id) REFERENCES repositories(id),
+    UNIQUE (repo_id, number)
+);
+
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS issue_labels (
+    issue_id INTEGER,
+    label_id INTEGER,
+    PRIMARY KEY (issue_id, label_id),
+    FOREIGN KEY (issue_id) REFERENCES issues(id),
+    FOREIGN KEY (label_id) REFERENCES labels(id)
+);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY,
+    issue_id INTEGER,
+    body TEXT,
+    author TEXT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (issue_id) REFERENCES issues(id)
+);
+
+CREATE TABLE IF NOT EXISTS api_logs (
+    id INTEGER PRIMARY KEY,
+    repo_id INTEGER,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    new_issues_count INTEGER DEFAULT 0,
+    updated_issues_count INTEGER DEFAULT 0,
+    redundant_issues_count INTEGER DEFAULT 0,
+    issues_before_count INTEGER DEFAULT 0,
+    issues_after_count INTEGER DEFAULT 0,
+    api_rate_limit_remaining INTEGER,
+    api_rate_limit_total INTEGER,
+    execution_time_seconds REAL,
+    FOREIGN KEY (repo_id) REFERENCES repositories(id)
+);
+
+-- Index the per-repository log lookups, which filter on repo_id and sort by timestamp
+CREATE INDEX IF NOT EXISTS idx_api_logs_repo_ts ON api_logs(repo_id, timestamp DESC);
+
+-- Per-repository issue listings sorted by update time, and issue counts by state
+CREATE INDEX IF NOT EXISTS idx_issues_repo_updated ON issues(repo_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_issues_repo_state ON issues(repo_id, state);
+
+-- Issues with the most comments, read straight from the index
+CREATE INDEX IF NOT EXISTS idx_issues_repo_comment_count ON issues(repo_id, comment_count DESC);
+
+-- Per-issue comment lookups, already in display order
+CREATE INDEX IF NOT EXISTS idx_comments_issue_created ON comments(issue_id, created_at);
+
+-- Refresh the planner statistics so the new indexes are considered
+ANALYZE;
+
+PRAGMA user_version = {_SCHEMA_VERSION};
+
+COMMIT;
+"""
+
+
+def dict_factory(cursor, row):
+    """Convert a row to a dictionary."""
+    d = {}
+    for idx, col in enumerate(cursor.description):
+        d[col[0]] = row[idx]
+    return d
 
 
 class SQLiteConnectionManager:
     """A class for managing SQLite database connections."""
 
-    def __init__(self, db_path: str = "./github_issues.db", timeout: int = 30):
+    # INSERT ... RETURNING needs SQLite 3.35 or later
+    supports_returning = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    def __init__(self, db_path: str = "./github_issues.db", timeout: int = 30, read_pool_size: int = 4):
         """
         Initialize the SQLite connection manager.
 
         Args:
             db_path: Path to the SQLite database file.
             timeout: Timeout in seconds for database operations.
+            read_pool_size: Number of idle read-only connections kept open for reuse.
         """
         self.db_path = db_path
         self.timeout = timeout
-        self._create_tables()
+        # One connection per thread, reused across calls instead of reopened for each query
+        self._local = threading.local()
+        # Every open per-thread connection with the thread that opened it, so close_all()
+        # can close them and the connections of exited threads can be closed early
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._lock = threading.Lock()
+        # Idle read-only connections, shared by all threads
+        self._read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=read_pool_size)
+        # Whether the tables have been checked; deferred until the database is first used
+        self._schema_ready = False
+        # URI of the database opened read-only. In-memory databases and paths that are
+        # already URIs have no separate read-only view, so reads use the write connection.
+        if db_path == ":memory:" or db_path == "" or db_path.startswith("file:"):
+            self._read_uri = None
+        else:
+            # as_uri() percent-encodes the characters that would otherwise be read as URI
+            # syntax ('?', '#', '%'), so both connections open the same file
+            self._read_uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
 
     def get_connection(self):
         """
         Get a database connection with proper settings.
 
+        The connection is opened on first use and reused by later calls from the same
+        thread, so each batch of writes costs one transaction rather than a reconnect.
+
+        Returns:
+            SQLite connection object.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            if not self._schema_ready:
+                self._ensure_schema(conn)
+            return conn
+
+        # Each connection is only used by the thread that opened it; check_same_thread
+        # is disabled so that close_all() can close it from another thread
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=_CACHED_STATEMENTS,
+        )
+        self._apply_pragmas(conn)
+
+        self._local.conn = conn
+        with self._lock:
+            # Close the connections left behind by threads that have exited; nothing can
+            # use them any more, and each one holds file descriptors until closed
+            alive = []
+            for thread, thread_conn in self._connections:
+                if thread.is_alive():
+                    alive.append((thread, thread_conn))
+                else:
+                    thread_conn.close()
+            alive.append((threading.current_thread(), conn))
+            self._connections = alive
+
+        if not self._schema_ready:
+            self._ensure_schema(conn)
+        return conn
+
+    def get_write_connection(self):
+        """
+        Get the connection used for writes; the same per-thread connection as get_connection().
+
+        Returns:
+            SQLite connection object.
+        """
+        return self.get_connection()
+
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read-only connection from the pool for the duration of a with block.
+
+        Read-only connections never hold a write lock, so under WAL any number of them
+        can read while another connection writes. They only see committed data.
+        In-memory databases are read through this thread's write connection instead.
+
+        Yields:
+            SQLite connection object opened in read-only mode.
+        """
+        if self._read_uri is None:
+            yield self.get_connection()
+            return
+
+        if not self._schema_ready:
+            # The database file, its schema and WAL mode are set up by a writable connection
+            self.get_connection()
+
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_read_connection()
+
+        try:
+            yield conn
+        finally:
+            # Release any read snapshot before the connection goes back to the pool
+            conn.rollback()
+            try:
+                self._read_pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _open_read_connection(self) -> sqlite3.Connection:
+        """
+        Open a read-only connection to the database.
+
         Returns:
             SQLite connection object.
         """
-        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
-        conn.row_factory = sqlite3.Row
+        conn = sqlite3.connect(
+            self._read_uri,
+            uri=True,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=_CACHED_STATEMENTS,
+        )
+        self._apply_pragmas(conn)
         return conn
 
-    def _create_tables(self):
+    def ensure_schema(self):
         """
         Create the necessary tables if they don't exist.
+
+        Runs automatically the first time a connection is opened, so constructing a
+        manager does not touch the database; call it explicitly to create the schema
+        up front (e.g. at application startup).
+        """
+        self.get_connection()
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        """
+        Create the tables through the given connection unless that has already been done.
+
+        Args:
+            conn: SQLite connection object.
+        """
+        # The flag is checked again and only set under the lock, so threads opening
+        # their first connections at the same time run the schema script once
+        with _SCHEMA_LOCK:
+            if self._schema_ready:
+                return
+            self._create_tables(conn)
+            self._schema_ready = True
+
+    @staticmethod
+    def scalar_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+        """
+        Get a cursor that returns plain tuples, for queries whose results are only read
+        by position. This is also the default for connections from this manager.
+
+        Args:
+            conn: SQLite connection object.
+
+        Returns:
+            SQLite cursor object.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
+
+    @staticmethod
+    def chunked(items: Sequence[Any], size: int = _MAX_IN_PARAMS) -> Iterator[Sequence[Any]]:
+        """
+        Split values bound to an IN (...) query into batches that stay under SQLite's
+        bound-parameter limit. Run the query once per batch and combine the results.
+
+        Args:
+            items: Values to bind.
+            size: Maximum number of values per batch.
+
+        Yields:
+            Consecutive slices of items.
+        """
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    @staticmethod
+    def dict_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+        """
+        Get a cursor that returns each row as a dictionary keyed by column name.
+
+        Connections return plain tuples by default; use this only for results that
+        are handed to callers as dictionaries.
+
+        Args:
+            conn: SQLite connection object.
+
+        Returns:
+            SQLite cursor object.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        return cursor
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """
+        Apply the connection settings to a newly opened connection.
+
+        Args:
+            conn: SQLite connection object.
+        """
+        if self.db_path not in _WAL_DATABASES:
+            # WAL lets readers proceed during batch writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            _WAL_DATABASES.add(self.db_path)
+
+        # The remaining settings are per connection. NORMAL sync fsyncs per checkpoint,
+        # not per commit; temp tables, the memory map and the page cache stay in memory.
+        # (The busy timeout comes from the timeout passed to sqlite3.connect.)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+
+    def close_all(self):
+        """
+        Close the connections of all threads and the idle read-only connections.
+        Later calls open new ones.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            conn.close()
+
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+        # A fresh thread-local store forgets every thread's closed connection
+        self._local = threading.local()
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        """
+        Create the necessary tables if they don't exist.
+
+        The DDL only runs when the database's recorded schema version is older than
+        _SCHEMA_VERSION, i.e. once per database file. Called with _SCHEMA_LOCK held.
+
+        Args:
+            conn: SQLite connection object.
+        """
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+
+        # Issues tables created before comment_count existed get the column, filled in
+        # from the stored comments, before the script indexes it
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(issues)")]
+        if columns and "comment_count" not in columns:
+            conn.executescript("""
+                BEGIN;
+                ALTER TABLE issues ADD COLUMN comment_count INTEGER DEFAULT 0;
+                UPDATE issues SET comment_count = (
+                    SELECT COUNT(*) FROM comments WHERE comments.issue_id = issues.id
+                );
+                COMMIT;
+            """)
+
+        conn.executescript(_SCHEMA_SQL)
+
+    def iter_query(self, query: str, params: Tuple = ()) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a custom SQL query, yielding the results one row at a time.
+
+        Args:
+            query: SQL query string.
+            params: Query parameters.
+
+        Yields:
+            Each result row as a dictionary.
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(query, params)
 
-            # Create repositories table
-            cursor.execute(
-                """
-            CREATE TABLE IF NOT EXISTS repositories (
-                id INTEGER PRIMARY KEY,
-                name TEXT UNIQUE,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-            )
-
-            # Create issues table
-            cursor.execute(
-                """
-            CREATE TABLE IF NOT EXISTS issues (
-                id INTEGER PRIMARY KEY,
-                repo_id INTEGER,
-                number INTEGER,
-                title TEXT,
-                body TEXT,
-                state TEXT,
-                created_at TIMESTAMP,
-                updated_at TIMESTAMP,
-                closed_at TIMESTAMP,
-                author TEXT,
-                html_url TEXT,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (repo_id) REFERENCES repositories(id),
-                UNIQUE (repo_id, number)
-            )
-            """
-            )
-
-            # Create labels table
-            cursor.execute(
-                """
-            CREATE TABLE IF NOT EXISTS labels (
-                id INTEGER PRIMARY KEY,
-                name TEXT UNIQUE
-            )
-            """
-            )
-
-            # Create issue_labels table
-            cursor.execute(
-                """
-            CREATE TABLE IF NOT EXISTS issue_labels (
-                issue_id INTEGER,
-                label_id INTEGER,
-                PRIMARY KEY (issue_id, label_id),
-                FOREIGN KEY (issue_id) REFERENCES issues(id),
-                FOREIGN KEY (label_id) REFERENCES labels(id)
-            )
-            """
-            )
-
-            # Create comments table
-            cursor.execute(
-                """
-            CREATE TABLE IF NOT EXISTS comments (
-                id INTEGER PRIMARY KEY,
-                issue_id INTEGER,
-                body TEXT,
-                author TEXT,
-                created_at TIMESTAMP,
-                updated_at TIMESTAMP,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (issue_id) REFERENCES issues(id)
-            )
-            """
-            )
-
-            # Create API logs table
-            cursor.execute(
-                """
-            CREATE TABLE IF NOT EXISTS api_logs (
-                id INTEGER PRIMARY KEY,
-                repo_id INTEGER,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                new_issues_count INTEGER DEFAULT 0,
-                updated_issues_count INTEGER DEFAULT 0,
-                redundant_issues_count INTEGER DEFAULT 0,
-                issues_before_count INTEGER DEFAULT 0,
-                issues_after_count INTEGER DEFAULT 0,
-                api_rate_limit_remaining INTEGER,
-                api_rate_limit_total INTEGER,
-                execution_time_seconds REAL,
-                FOREIGN KEY (repo_id) REFERENCES repositories(id)
-            )
-            """
-            )
-
-            conn.commit()
+            # Resolve column names once rather than per row
+            columns = [d[0] for d in cursor.description or ()]
+            for row in cursor:
+                yield dict(zip(columns, row))
 
     def execute_query(self, query: str, params: Tuple = ()) -> List[Dict[str, Any]]:
         """
@@ -146,16 +447,7 @@ class SQLiteConnectionManager:
         Returns:
             List of results as dictionaries.
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-
-            # Convert results to dictionaries
-            results = []
-            for row in cursor.fetchall():
-                results.append({key: row[key] for key in row.keys()})
-
-            return results
+        return list(self.iter_query(query, params))
 
     def parse_timestamp(self, timestamp_str: Optional[str]) -> Optional[str]:
         """
@@ -171,13 +463,17 @@ class SQLiteConnectionManager:
         if not timestamp_str:
             return None
 
-        import datetime
-        import re
+        # Fast paths for GitHub UTC timestamps: keep the date and time, drop the rest. The
+        # plain 'YYYY-MM-DDTHH:MM:SSZ' form GitHub always sends is recognized without a regex.
+        if len(timestamp_str) == 20 and timestamp_str[19] == "Z" and timestamp_str[10] == "T":
+            return timestamp_str[:10] + " " + timestamp_str[11:19]
+        if _FAST.match(timestamp_str):
+            return timestamp_str[:10] + " " + timestamp_str[11:19]
 
         # Remove timezone information if present
         # GitHub API returns timestamps in ISO 8601 format with Z suffix (UTC)
-        timestamp_str = re.sub(r"Z$", "", timestamp_str)
-        timestamp_str = re.sub(r"[+-]\d{2}:\d{2}$", "", timestamp_str)
+        timestamp_str = _TZ_Z.sub("", timestamp_str)
+        timestamp_str = _TZ_OFF.sub("", timestamp_str)
 
         try:
             # Parse the timestamp
@@ -4,10 +4,29 @@ Issue Manager
 This module provides a class for managing issue data in the SQLite database.
 """
 
+import datetime
+from collections import defaultdict
 from typing import Any, Dict, List, Optional, Set
 from .connection_manager import SQLiteConnectionManager
 from .repository_manager import RepositoryManager
 
+# Columns returned by get_issues for issues and their comments
+_ISSUE_COLUMNS = (
+    "id, repo_id, number, title, body, state, created_at, updated_at, closed_at, author, html_url"
+)
+_COMMENT_COLUMNS = "id, issue_id, body, author, created_at, updated_at"
+
+
+def _label_name(label: Any) -> Optional[str]:
+    """Get the name of a label given either as a GitHub label dict or as a plain name."""
+    return label.get("name") if type(label) is dict else label
+
+
+def _user_login(item: Dict[str, Any]) -> str:
+    """Get the login of the user of an issue or comment, or "" if there is none."""
+    user = item.get("user")
+    return user.get("login", "") if type(user) is dict else ""
+
 
 class IssueManager:
     """A class for managing issue data in the SQLite database."""
@@ -26,7 +45,7 @@ class IssueManager:
         self.repository_manager = repository_manager
 
     def create_tables(self):
-        """Create the issues and comments tables if they don't exist."""
+        """Create the issues, comments and labels tables if they don't exist."""
         conn = self.connection_manager.get_connection()
         cursor = conn.cursor()
         
@@ -44,6 +63,7 @@ class IssueManager:
                 closed_at TIMESTAMP,
                 author TEXT,
                 html_url TEXT,
+                comment_count INTEGER DEFAULT 0,
                 FOREIGN KEY (repo_id) REFERENCES repositories(id),
                 UNIQUE (repo_id, number)
             )
@@ -62,6 +82,37 @@ class IssueManager:
                 FOREIGN KEY (issue_id) REFERENCES issues(id)
             )
         """)
+
+        # Create labels tables; the unique label name lets store_issues upsert labels
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS labels (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS issue_labels (
+                issue_id INTEGER,
+                label_id INTEGER,
+                PRIMARY KEY (issue_id, label_id),
+                FOREIGN KEY (issue_id) REFERENCES issues(id),
+                FOREIGN KEY (label_id) REFERENCES labels(id)
+            )
+        """)
+
+        # Index the per-repository issue listings and counts and the per-issue comment lookups
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_issues_repo_updated ON issues(repo_id, updated_at DESC)"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_issues_repo_state ON issues(repo_id, state)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_issues_repo_comment_count "
+            "ON issues(repo_id, comment_count DESC)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_comments_issue_created ON comments(issue_id, created_at)"
+        )
+        cursor.execute("ANALYZE")
         
         conn.commit()
 
@@ -81,76 +132,127 @@ class IssueManager:
 
         repo_id = self.repository_manager.get_or_create_repo(repo_name)
 
-        # Count issues before the update
-        issues_before_count = len(self.get_issue_numbers(repo_name))
+        # Get the stored update time of every existing issue and count issues before the update
+        stored_updated_at = self._get_issue_updated_at(repo_id)
+        issues_before_count = len(stored_updated_at)
 
         # Track new and updated issues
         new_issues_count = 0
         updated_issues_count = 0
         redundant_issues_count = 0
 
-        # Get existing issue numbers
-        existing_issue_numbers = set(self.get_issue_numbers(repo_name))
-
         # Get the latest API call timestamp
         last_api_call = self.get_latest_api_call_timestamp(repo_name)
 
-        # Use a single connection for the entire operation
+        # When polling, whole batches are often known issues not updated since the last API
+        # call; count them all as redundant without classifying them one by one. GitHub's
+        # 'YYYY-MM-DDTHH:MM:SSZ' timestamps are converted to the 'YYYY-MM-DD HH:MM:SS' form
+        # the API log uses before comparing, since the strings only order correctly then.
+        parse_timestamp = self.connection_manager.parse_timestamp
+        if (
+            last_api_call
+            and max(parse_timestamp(issue.get("updated_at")) or "" for issue in issues) <= last_api_call
+            and all(issue["number"] in stored_updated_at for issue in issues)
+        ):
+            return {
+                "new_count": 0,
+                "updated_count": 0,
+                "redundant_count": len(issues),
+                "issues_before_count": issues_before_count,
+                "issues_after_count": issues_before_count,
+            }
+
+        # Classify the issues before opening a transaction, so that unchanged issues are
+        # skipped without any database writes
+        issues_to_store = []
+        for issue in issues:
+            # Determine if this is a new, updated, or redundant issue
+            is_new = issue["number"] not in stored_updated_at
+            issue_updated_at = issue.get("updated_at")
+            updated_at = self.connection_manager.parse_timestamp(issue_updated_at)
+
+            if is_new:
+                new_issues_count += 1
+            elif updated_at == stored_updated_at[issue["number"]]:
+                # Unchanged since it was stored
+                redundant_issues_count += 1
+                continue
+            elif last_api_call:
+                # Check if the issue was updated after the last API call
+                if issue_updated_at and issue_updated_at > last_api_call:
+                    updated_issues_count += 1
+                else:
+                    redundant_issues_count += 1
+                    continue
+            else:
+                updated_issues_count += 1
+
+            issues_to_store.append((issue, updated_at))
+
+        if not issues_to_store:
+            return {
+                "new_count": new_issues_count,
+                "updated_count": updated_issues_count,
+                "redundant_count": redundant_issues_count,
+                "issues_before_count": issues_before_count,
+                "issues_after_count": issues_before_count,
+            }
+
+        # Use a single connection and transaction for the entire operation. The write lock
+        # is taken up front, so the transaction never has to upgrade a read lock mid-batch;
+        # the with block commits on success and rolls back on error.
         with self.connection_manager.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
             cursor = conn.cursor()
 
-            # Pre-fetch or create all labels to avoid nested transactions
+            # Pre-fetch or create all labels to avoid nested transactions. With RETURNING,
+            # one upsert per batch of names both creates the missing labels and returns
+            # every ID; otherwise create the missing ones with one executemany, then read
+            # every ID with one query per batch of names
+            label_names = list({
+                _label_name(label)
+                for issue, _ in issues_to_store
+                for label in issue.get("labels", [])
+            } - {None, ""})
             label_ids = {}
-            for issue in issues:
-                for label in issue.get("labels", []):
-                    label_name = label.get("name") if isinstance(label, dict) else label
-                    if label_name and label_name not in label_ids:
-                        # Check if label exists
-                        cursor.execute("SELECT id FROM labels WHERE name = ?", (label_name,))
-                        result = cursor.fetchone()
-
-                        if result:
-                            label_ids[label_name] = result[0]
-                        else:
-                            # Create new label
-                            cursor.execute("INSERT INTO labels (name) VALUES (?)", (label_name,))
-                            label_ids[label_name] = cursor.lastrowid
-
-            for issue in issues:
-                # Determine if this is a new, updated, or redundant issue
-                is_new = issue["number"] not in existing_issue_numbers
-                is_redundant = False
-
-                if is_new:
-                    new_issues_count += 1
-                elif last_api_call:
-                    # Check if the issue was updated after the last API call
-                    issue_updated_at = issue.get("updated_at")
-                    if issue_updated_at and issue_updated_at > last_api_call:
-                        updated_issues_count += 1
-                    else:
-                        redundant_issues_count += 1
-                        is_redundant = True
-                else:
-                    updated_issues_count += 1
-
-                # Skip redundant issues - don't write them to the database
-                if is_redundant:
-                    continue
-
-                # Insert issue
+            if label_names and self.connection_manager.supports_returning:
+                for batch in self.connection_manager.chunked(label_names):
+                    values = ", ".join(["(?)"] * len(batch))
+                    cursor.execute(
+                        f"""
+                        INSERT INTO labels (name) VALUES {values}
+                        ON CONFLICT(name) DO UPDATE SET name = excluded.name
+                        RETURNING name, id
+                        """,
+                        batch,
+                    )
+                    label_ids.update(cursor.fetchall())
+            elif label_names:
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO labels (name) VALUES (?)",
+                    [(label_name,) for label_name in label_names],
+                )
+                for batch in self.connection_manager.chunked(label_names):
+                    placeholders = ", ".join("?" * len(batch))
+                    cursor.execute(f"SELECT name, id FROM labels WHERE name IN ({placeholders})", batch)
+                    label_ids.update(cursor.fetchall())
+
+            # Collect rows so each table is written with a single executemany call. Every
+            # row is stamped with the same added_at, bound as a parameter
+            now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            issue_rows = []
+            label_rows = []
+            comment_rows = []
+            stored_issue_ids = []
+            commented_issue_ids = []
+
+            for issue, updated_at in issues_to_store:
+                # Issue row
                 issue_id = issue["id"]
                 created_at = self.connection_manager.parse_timestamp(issue.get("created_at"))
-                updated_at = self.connection_manager.parse_timestamp(issue.get("updated_at"))
                 closed_at = self.connection_manager.parse_timestamp(issue.get("closed_at"))
 
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO issues (
-                        id, repo_id, number, title, body, state, 
-                        created_at, updated_at, closed_at, author, html_url, added_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                    """,
+                issue_rows.append(
                     (
                         issue_id,
                         repo_id,
@@ -161,31 +263,22 @@ class IssueManager:
                         created_at,
                         updated_at,
                         closed_at,
-                        (
-                            issue.get("user", {}).get("login", "")
-                            if isinstance(issue.get("user"), dict)
-                            else ""
-                        ),
+                        _user_login(issue),
                         issue.get("html_url", ""),
-                    ),
+                        now,
+                    )
                 )
+                stored_issue_ids.append((issue_id,))
 
-                # Clear existing labels for this issue
-                cursor.execute("DELETE FROM issue_labels WHERE issue_id = ?", (issue_id,))
-
-                # Add labels
+                # Label rows
                 for label in issue.get("labels", []):
-                    label_name = label.get("name") if isinstance(label, dict) else label
+                    label_name = _label_name(label)
                     if label_name and label_name in label_ids:
-                        cursor.execute(
-                            "INSERT OR IGNORE INTO issue_labels (issue_id, label_id) VALUES (?, ?)",
-                            (issue_id, label_ids[label_name]),
-                        )
+                        label_rows.append((issue_id, label_ids[label_name]))
 
-                # Add comments
+                # Comment rows
                 if "comments" in issue and issue["comments"]:
-                    # Clear existing comments for this issue
-                    cursor.execute("DELETE FROM comments WHERE issue_id = ?", (issue_id,))
+                    commented_issue_ids.append((issue_id,))
 
                     for comment in issue["comments"]:
                         comment_id = comment.get("id")
@@ -196,30 +289,62 @@ class IssueManager:
                             comment.get("updated_at")
                         )
 
-                        cursor.execute(
-                            """
-                            INSERT OR REPLACE INTO comments (
-                                id, issue_id, body, author, created_at, updated_at, added_at
-                            ) VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
-                            """,
+                        comment_rows.append(
                             (
                                 comment_id,
                                 issue_id,
                                 comment.get("body", ""),
-                                (
-                                    comment.get("user", {}).get("login", "")
-                                    if isinstance(comment.get("user"), dict)
-                                    else ""
-                                ),
+                                _user_login(comment),
                                 created_at,
                                 updated_at,
-                            ),
+                                now,
+                            )
                         )
 
+            # Insert issues
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO issues (
+                    id, repo_id, number, title, body, state, 
+                    created_at, updated_at, closed_at, author, html_url, added_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                issue_rows,
+            )
+
+            # Replace labels for the stored issues
+            cursor.executemany("DELETE FROM issue_labels WHERE issue_id = ?", stored_issue_ids)
+            cursor.executemany(
+                "INSERT OR IGNORE INTO issue_labels (issue_id, label_id) VALUES (?, ?)",
+                label_rows,
+            )
+
+            # Replace comments for the issues that came with comments
+            cursor.executemany("DELETE FROM comments WHERE issue_id = ?", commented_issue_ids)
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO comments (
+                    id, issue_id, body, author, created_at, updated_at, added_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                comment_rows,
+            )
+
+            # Refresh the stored comment counts; issues that came without comments keep
+            # their existing ones
+            cursor.executemany(
+                """
+                UPDATE issues
+                SET comment_count = (SELECT COUNT(*) FROM comments WHERE issue_id = issues.id)
+                WHERE id = ?
+                """,
+                stored_issue_ids,
+            )
+
             conn.commit()
 
-        # Count issues after the update
-        issues_after_count = len(self.get_issue_numbers(repo_name))
+        # Count issues after the update; COUNT(*) avoids fetching every issue number again
+        issues_after_count = self.get_issue_count(repo_name)
 
         return {
             "new_count": new_issues_count,
@@ -229,6 +354,23 @@ class IssueManager:
             "issues_after_count": issues_after_count,
         }
 
+    def _get_issue_updated_at(self, repo_id: int) -> Dict[int, Optional[str]]:
+        """
+        Get the stored update time of each issue in a repository.
+
+        Args:
+            repo_id: ID of the repository.
+
+        Returns:
+            Dictionary mapping issue numbers to their stored updated_at values.
+        """
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
+
+            cursor.execute("SELECT number, updated_at FROM issues WHERE repo_id = ?", (repo_id,))
+
+            return dict(cursor.fetchall())
+
     def get_issue_numbers(self, repo_name: str) -> List[int]:
         """
         Get the issue numbers for a repository.
@@ -243,33 +385,54 @@ class IssueManager:
         if not repo_id:
             return []
 
-        with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
+
+            cursor.execute("SELECT number FROM issues WHERE repo_id = ?", (repo_id,))
+
+            return [row[0] for row in cursor]
+
+    def get_issue_number_set(self, repo_name: str) -> Set[int]:
+        """
+        Get the issue numbers for a repository as a set, built directly from the cursor.
+
+        Args:
+            repo_name: Name of the repository.
+
+        Returns:
+            Set of issue numbers.
+        """
+        repo_id = self.repository_manager.get_repo_id(repo_name)
+        if not repo_id:
+            return set()
+
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
 
             cursor.execute("SELECT number FROM issues WHERE repo_id = ?", (repo_id,))
 
-            return [row[0] for row in cursor.fetchall()]
+            return {row[0] for row in cursor}
     
-    def get_issue_codes(self, repo_name: str) -> List[str]:
+    def get_issue_codes(self, repo_name: str) -> Set[str]:
         """
-        Get the issue numbers for a repository.
+        Get the issue codes for a repository.
 
         Args:
             repo_name: Name of the repository.
 
         Returns:
-            List of strings where each string is a combination of issue number and updated_at date
+            Set of strings where each string is a combination of issue number and updated_at date
         """
         repo_id = self.repository_manager.get_repo_id(repo_name)
         if not repo_id:
-            return []
+            return set()
 
-        with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
 
             cursor.execute("SELECT number, updated_at FROM issues WHERE repo_id = ?", (repo_id,))
 
-            return [str(row[0])+ '_' + str(row[1]) for row in cursor.fetchall()]
+            return {f"{number}_{updated_at}" for number, updated_at in cursor}
 
     def get_latest_api_call_timestamp(self, repo_name: str) -> Optional[str]:
         """
@@ -285,8 +448,8 @@ class IssueManager:
         if not repo_id:
             return None
 
-        with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
 
             cursor.execute(
                 "SELECT timestamp FROM api_logs WHERE repo_id = ? ORDER BY timestamp DESC LIMIT 1",
@@ -317,49 +480,64 @@ class IssueManager:
         if not repo_id:
             return []
 
-        with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
 
-            query = "SELECT * FROM issues WHERE repo_id = ?"
+            query = f"SELECT {_ISSUE_COLUMNS} FROM issues WHERE repo_id = ?"
             params = [repo_id]
 
             if state:
                 query += " AND state = ?"
                 params.append(state)
 
-            query += " ORDER BY updated_at DESC"
-
-            if limit:
-                query += " LIMIT ?"
-                params.append(limit)
+            # Always bind the limit so the statement text only varies with the state filter; -1 means no limit
+            query += " ORDER BY updated_at DESC LIMIT ?"
+            params.append(limit if limit else -1)
 
             cursor.execute(query, params)
+            # Resolve column names once rather than per row
+            columns = [d[0] for d in cursor.description]
+            issues = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            if not issues:
+                return issues
+
+            # Fetch the labels and comments of all the issues with one query each instead
+            # of two per issue (in batches that stay under SQLite's bound-parameter limit),
+            # then attach them by issue ID
+            labels_by_issue = defaultdict(list)
+            comments_by_issue = defaultdict(list)
+            for batch in self.connection_manager.chunked(issues):
+                issue_ids = [issue["id"] for issue in batch]
+                placeholders = ",".join("?" * len(issue_ids))
 
-            issues = []
-            for row in cursor.fetchall():
-                issue = dict(row)
-
-                # Get labels
                 cursor.execute(
-                    """
-                    SELECT l.name
+                    f"""
+                    SELECT il.issue_id, l.name
                     FROM issue_labels il
                     JOIN labels l ON il.label_id = l.id
-                    WHERE il.issue_id = ?
+                    WHERE il.issue_id IN ({placeholders})
                     """,
-                    (issue["id"],),
+                    issue_ids,
                 )
+                for issue_id, name in cursor.fetchall():
+                    labels_by_issue[issue_id].append(name)
 
-                issue["labels"] = [row[0] for row in cursor.fetchall()]
-
-                # Get comments
                 cursor.execute(
-                    "SELECT * FROM comments WHERE issue_id = ? ORDER BY created_at", (issue["id"],)
+                    f"""
+                    SELECT {_COMMENT_COLUMNS} FROM comments
+                    WHERE issue_id IN ({placeholders})
+                    ORDER BY issue_id, created_at
+                    """,
+                    issue_ids,
                 )
+                columns = [d[0] for d in cursor.description]
+                for row in cursor.fetchall():
+                    comment = dict(zip(columns, row))
+                    comments_by_issue[comment["issue_id"]].append(comment)
 
-                issue["comments"] = [dict(row) for row in cursor.fetchall()]
-
-                issues.append(issue)
+            for issue in issues:
+                issue["labels"] = labels_by_issue[issue["id"]]
+                issue["comments"] = comments_by_issue[issue["id"]]
 
             return issues
 
@@ -378,8 +556,8 @@ class IssueManager:
         if not repo_id:
             return 0
 
-        with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
 
             query = "SELECT COUNT(*) FROM issues WHERE repo_id = ?"
             params = [repo_id]
@@ -392,6 +570,35 @@ class IssueManager:
 
             return cursor.fetchone()[0]
 
+    def get_issue_counts(self, repo_name: str) -> Dict[str, int]:
+        """
+        Get the number of issues for a repository, in total and per state, with a single query.
+
+        Args:
+            repo_name: Name of the repository.
+
+        Returns:
+            Dictionary with a "total" count plus one count per issue state (e.g. "open", "closed").
+        """
+        counts = {"total": 0, "open": 0, "closed": 0}
+
+        repo_id = self.repository_manager.get_repo_id(repo_name)
+        if not repo_id:
+            return counts
+
+        with self.connection_manager.read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "SELECT state, COUNT(*) FROM issues WHERE repo_id = ? GROUP BY state", (repo_id,)
+            )
+
+            for state, count in cursor.fetchall():
+                counts[state] = count
+                counts["total"] += count
+
+            return counts
+
     def get_comment_count(self, repo_name: str) -> int:
         """
         Get the number of comments for a repository.
@@ -406,8 +613,8 @@ class IssueManager:
         if not repo_id:
             return 0
 
-        with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
 
             cursor.execute(
                 """
@@ -436,20 +643,19 @@ class IssueManager:
         if not repo_id:
             return []
 
-        with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+        with self.connection_manager.read_connection() as conn:
+            cursor = self.connection_manager.dict_cursor(conn)
 
+            # comment_count is maintained by store_issues, so no join with comments is needed
             cursor.execute(
                 """
-                SELECT i.id, i.number, i.title, i.state, COUNT(c.id) as comment_count
-                FROM issues i
-                LEFT JOIN comments c ON i.id = c.issue_id
-                WHERE i.repo_id = ?
-                GROUP BY i.id
+                SELECT id, number, title, state, comment_count
+                FROM issues
+                WHERE repo_id = ?
                 ORDER BY comment_count DESC
                 LIMIT ?
                 """,
                 (repo_id, limit),
             )
 
-            return [dict(row) for row in cursor.fetchall()]
+            return cursor.fetchall()
@@ -4,7 +4,7 @@ Repository Manager
 This module provides a class for managing repository data in the SQLite database.
 """
 
-from typing import Optional
+from typing import Dict, Optional
 from .connection_manager import SQLiteConnectionManager
 
 
@@ -19,6 +19,8 @@ class RepositoryManager:
             connection_manager: The SQLite connection manager.
         """
         self.connection_manager = connection_manager
+        # Repository name -> ID; repositories are never renamed or deleted, and there are few
+        self._repo_ids: Dict[str, int] = {}
 
     def create_tables(self):
         """Create the repositories table if it doesn't exist."""
@@ -37,7 +39,7 @@ class RepositoryManager:
 
     def get_or_create_repo(self, repo_name: str) -> int:
         """
-        Get or create a repository record.
+        Get or create a repository record. The ID is cached after the first lookup.
 
         Args:
             repo_name: Name of the repository.
@@ -45,27 +47,45 @@ class RepositoryManager:
         Returns:
             The repository ID.
         """
-        with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
-
-            # Check if repository exists
-            cursor.execute("SELECT id FROM repositories WHERE name = ?", (repo_name,))
-            result = cursor.fetchone()
-
-            if result:
-                return result[0]
+        repo_id = self._repo_ids.get(repo_name)
+        if repo_id is not None:
+            return repo_id
 
-            # Create new repository with current timestamp
-            cursor.execute(
-                "INSERT INTO repositories (name, added_at) VALUES (?, datetime('now'))",
-                (repo_name,),
-            )
-
-            return cursor.lastrowid
+        with self.connection_manager.get_connection() as conn:
+            cursor = self.connection_manager.scalar_cursor(conn)
+
+            if self.connection_manager.supports_returning:
+                # Insert or look up the repository in a single statement
+                cursor.execute(
+                    """
+                    INSERT INTO repositories (name, added_at) VALUES (?, datetime('now'))
+                    ON CONFLICT(name) DO UPDATE SET name = excluded.name
+                    RETURNING id
+                    """,
+                    (repo_name,),
+                )
+                repo_id = cursor.fetchone()[0]
+            else:
+                # Check if repository exists
+                cursor.execute("SELECT id FROM repositories WHERE name = ?", (repo_name,))
+                result = cursor.fetchone()
+
+                if result:
+                    repo_id = result[0]
+                else:
+                    # Create new repository with current timestamp
+                    cursor.execute(
+                        "INSERT INTO repositories (name, added_at) VALUES (?, datetime('now'))",
+                        (repo_name,),
+                    )
+                    repo_id = cursor.lastrowid
+
+        self._repo_ids[repo_name] = repo_id
+        return repo_id
 
     def get_repo_id(self, repo_name: str) -> Optional[int]:
         """
-        Get the ID of a repository.
+        Get the ID of a repository. The ID is cached after the first successful lookup.
 
         Args:
             repo_name: Name of the repository.
@@ -73,13 +93,18 @@ class RepositoryManager:
         Returns:
             The repository ID, or None if the repository doesn't exist.
         """
+        repo_id = self._repo_ids.get(repo_name)
+        if repo_id is not None:
+            return repo_id
+
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self.connection_manager.scalar_cursor(conn)
 
             cursor.execute("SELECT id FROM repositories WHERE name = ?", (repo_name,))
             result = cursor.fetchone()
 
-            if result:
-                return result[0]
+            if not result:
+                return None
 
-            return None
+        self._repo_ids[repo_name] = result[0]
+        return result[0]
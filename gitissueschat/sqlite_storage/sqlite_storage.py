@@ -4,37 +4,34 @@ SQLite Issue Storage
 This module provides the main SQLiteIssueStorage class that integrates all storage components.
 """
 
-from typing import Any, Dict, List, Optional, Set, Tuple
-from .connection_manager import SQLiteConnectionManager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from .connection_manager import SQLiteConnectionManager, dict_factory
 from .repository_manager import RepositoryManager
 from .issue_manager import IssueManager
 from .api_log_manager import APILogManager
 
 
-def dict_factory(cursor, row):
-    """Convert a row to a dictionary."""
-    d = {}
-    for idx, col in enumerate(cursor.description):
-        d[col[0]] = row[idx]
-    return d
-
-
 class SQLiteIssueStorage:
     """A class for storing GitHub issues in a SQLite database."""
 
-    def __init__(self, db_path: str = "./github_issues.db", timeout: int = 30):
+    def __init__(self, db_path: str = "./github_issues.db", timeout: int = 30, read_pool_size: int = 4):
         """
         Initialize the SQLite issue storage.
 
         Args:
             db_path: Path to the SQLite database file.
             timeout: Timeout in seconds for database operations.
+            read_pool_size: Number of idle read-only connections kept open for reuse.
         """
-        self.connection_manager = SQLiteConnectionManager(db_path, timeout)
+        self.connection_manager = SQLiteConnectionManager(db_path, timeout, read_pool_size)
         self.repository_manager = RepositoryManager(self.connection_manager)
         self.issue_manager = IssueManager(self.connection_manager, self.repository_manager)
         self.api_log_manager = APILogManager(self.connection_manager, self.repository_manager)
     
+    def close(self):
+        """Close all database connections opened by this storage."""
+        self.connection_manager.close_all()
+    
     def create_tables(self):
         """Create all necessary tables if they don't exist."""
         # Create tables in each manager
@@ -66,16 +63,28 @@ class SQLiteIssueStorage:
             List of issue numbers.
         """
         return self.issue_manager.get_issue_numbers(repo_name)
+
+    def get_issue_number_set(self, repo_name: str) -> Set[int]:
+        """
+        Get the issue numbers for a repository as a set.
+
+        Args:
+            repo_name: Name of the repository.
+
+        Returns:
+            Set of issue numbers.
+        """
+        return self.issue_manager.get_issue_number_set(repo_name)
     
-    def get_issue_codes(self, repo_name: str) -> List[str]:
+    def get_issue_codes(self, repo_name: str) -> Set[str]:
         """
-        Get the issue numbers for a repository.
+        Get the issue codes for a repository.
 
         Args:
             repo_name: Name of the repository.
 
         Returns:
-            List of strings where each string is a combination of issue number and updated_at date
+            Set of strings where each string is a combination of issue number and updated_at date
         """
         return self.issue_manager.get_issue_codes(repo_name)
 
@@ -108,6 +117,18 @@ class SQLiteIssueStorage:
         """
         return self.issue_manager.get_issue_count(repo_name, state)
 
+    def get_issue_counts(self, repo_name: str) -> Dict[str, int]:
+        """
+        Get the number of issues for a repository, in total and per state, with a single query.
+
+        Args:
+            repo_name: Name of the repository.
+
+        Returns:
+            Dictionary with a "total" count plus one count per issue state (e.g. "open", "closed").
+        """
+        return self.issue_manager.get_issue_counts(repo_name)
+
     def get_comment_count(self, repo_name: str) -> int:
         """
         Get the number of comments for a repository.
@@ -174,6 +195,16 @@ class SQLiteIssueStorage:
             execution_time_seconds,
         )
 
+    def log_api_calls_bulk(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Log many API calls in a single transaction.
+
+        Args:
+            entries: API call logs, each a dictionary with the keyword arguments of
+                log_api_call (repo_name is required, the counts are optional).
+        """
+        self.api_log_manager.log_api_calls_bulk(entries)
+
     def get_api_logs(self, repo_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get API logs for a repository.
@@ -212,6 +243,19 @@ class SQLiteIssueStorage:
         """
         return self.issue_manager.get_latest_api_call_timestamp(repo_name)
 
+    def iter_query(self, query: str, params: Tuple = ()) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a custom SQL query, yielding the results one row at a time.
+
+        Args:
+            query: SQL query string.
+            params: Query parameters.
+
+        Yields:
+            Each result row as a dictionary.
+        """
+        yield from self.connection_manager.iter_query(query, params)
+
     def execute_query(self, query: str, params: Tuple = ()) -> List[Dict[str, Any]]:
         """
         Execute a custom SQL query.
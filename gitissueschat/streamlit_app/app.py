@@ -6,14 +6,16 @@ to interact with the system through a chat interface with a customizable sidebar
 """
 
 import os
-import json
+import sys
+import asyncio
+import functools
 import logging
 import time
-import subprocess
 import threading
+import concurrent.futures
+from collections import deque
 import streamlit as st
-import glob
-from typing import Dict, List, Any, Optional
+from typing import Deque, Dict, FrozenSet, List, Any, Optional
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -23,19 +25,18 @@ from gitissueschat.rag.rag_orchestrator import RAGOrchestrator
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Paths used by the app, computed once when the script runs
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DB_ROOT = os.path.join(_PROJECT_ROOT, "data", "chroma_dbs")
+_UTILS_DIR = os.path.join(_PROJECT_ROOT, "gitissueschat", "utils")
+
 # Load environment variables
-dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env")
+dotenv_path = os.path.join(_PROJECT_ROOT, ".env")
 if os.path.exists(dotenv_path):
     load_dotenv(dotenv_path)
     logger.info(f"Loaded environment variables from {dotenv_path}")
 else:
-    # Try alternate path
-    dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env")
-    if os.path.exists(dotenv_path):
-        load_dotenv(dotenv_path)
-        logger.info(f"Loaded environment variables from {dotenv_path}")
-    else:
-        logger.warning(f"Environment file not found")
+    logger.warning(f"Environment file not found")
 
 # Get project ID from environment
 project_id = os.environ.get("GOOGLE_PROJECT_ID")
@@ -49,22 +50,60 @@ if not credentials_path:
     logger.error("GOOGLE_APPLICATION_CREDENTIALS environment variable not set")
     st.error("GOOGLE_APPLICATION_CREDENTIALS environment variable not set")
 
-# Create temp directory for process results
-temp_dir = os.path.join(os.path.dirname(__file__), "temp")
-os.makedirs(temp_dir, exist_ok=True)
+@st.cache_data(show_spinner=False)
+def _list_databases(mtime: float, path: str) -> List[str]:
+    """List the database subdirectories of a directory.
+
+    Cached per directory modification time, which changes whenever a database
+    directory is added or removed, so reruns don't list the directory again.
+
+    Args:
+        mtime: Modification time of the directory, used as part of the cache key.
+        path: The directory to list.
+
+    Returns:
+        The names of the subdirectories.
+    """
+    # DirEntry.is_dir() uses the type returned by the directory listing, without an extra stat
+    with os.scandir(path) as entries:
+        databases = [entry.name for entry in entries if entry.is_dir()]
+    logger.info(f"Found {len(databases)} databases: {databases}")
+    return databases
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _databases_set(mtime: float, path: str) -> FrozenSet[str]:
+    """Get the database subdirectories of a directory as a set, for membership checks.
+
+    Cached per directory modification time like _list_databases. The frozenset is
+    shared rather than copied on every call, and only the latest listing is kept.
+
+    Args:
+        mtime: Modification time of the directory, used as part of the cache key.
+        path: The directory to list.
+
+    Returns:
+        The names of the subdirectories.
+    """
+    return frozenset(_list_databases(mtime, path))
+
+def _get_db_root_mtime() -> Optional[float]:
+    """Get the modification time of the ./data/chroma_dbs directory, or None if it doesn't exist."""
+    # A single stat both checks that the directory exists and reads its mtime
+    try:
+        return os.stat(_DB_ROOT).st_mtime
+    except FileNotFoundError:
+        return None
 
 def get_available_databases():
     """Get available databases from the ./data/chroma_dbs directory."""
-    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "chroma_dbs")
-    if not os.path.exists(db_path):
-        logger.warning(f"Database directory {db_path} not found")
+    mtime = _get_db_root_mtime()
+    if mtime is None:
+        logger.warning(f"Database directory {_DB_ROOT} not found")
         return []
     
-    # Get all subdirectories in the chroma_dbs directory
-    databases = [os.path.basename(db) for db in glob.glob(os.path.join(db_path, "*")) if os.path.isdir(db)]
-    logger.info(f"Found {len(databases)} databases: {databases}")
-    return databases
+    return _list_databases(mtime, _DB_ROOT)
 
+@functools.lru_cache(maxsize=256)
 def normalize_repo_name(repo_input: str) -> str:
     """Normalize a repository name from various formats to owner_repo format.
     
@@ -103,18 +142,50 @@ def repository_exists(repo_input: str) -> bool:
     # Normalize the repository name
     normalized_name = normalize_repo_name(repo_input)
     
-    # Get available databases
-    available_dbs = get_available_databases()
+    mtime = _get_db_root_mtime()
+    if mtime is None:
+        return False
     
-    # Check if the normalized name exists in available databases
-    return normalized_name in available_dbs
+    # Check the normalized name against the cached set of available databases
+    return normalized_name in _databases_set(mtime, _DB_ROOT)
+
+@st.cache_resource(show_spinner=False)
+def _build_orchestrator(
+    db_path: str,
+    collection_name: str,
+    project_id: Optional[str],
+    credentials_path: Optional[str],
+    model_name: str
+) -> RAGOrchestrator:
+    """Build a RAG orchestrator, shared across reruns and sessions for the same arguments.
+
+    Args:
+        db_path: Path to the ChromaDB database.
+        collection_name: Name of the ChromaDB collection.
+        project_id: Google Cloud project ID.
+        credentials_path: Path to the service account credentials file.
+        model_name: Name of the Gemini model to use.
+
+    Returns:
+        The RAG orchestrator.
+    """
+    return RAGOrchestrator(
+        db_path=db_path,
+        collection_name=collection_name,
+        project_id=project_id,
+        api_key=None,  # We're using service account credentials
+        credentials_path=credentials_path,
+        top_k=10,
+        relevance_threshold=0.5,
+        model_name=model_name,
+        temperature=0.2
+    )
 
 def initialize_rag_orchestrator():
-    """Initialize the RAG orchestrator."""
+    """Initialize the RAG orchestrator, reusing the cached one for the selected database."""
     try:
         # Use the selected database if available, otherwise use the default
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-                             "data", "chroma_dbs", st.session_state.selected_db) if st.session_state.selected_db else "./chroma_fastai"
+        db_path = os.path.join(_DB_ROOT, st.session_state.selected_db) if st.session_state.selected_db else "./chroma_fastai"
         
         # Log the full path for debugging
         logger.info(f"Initializing RAG orchestrator with database path: {os.path.abspath(db_path)}")
@@ -122,16 +193,8 @@ def initialize_rag_orchestrator():
         # Use a consistent collection name
         collection_name = "github_issues"
         
-        orchestrator = RAGOrchestrator(
-            db_path=db_path,
-            collection_name=collection_name,
-            project_id=project_id,
-            api_key=None,  # We're using service account credentials
-            credentials_path=credentials_path,
-            top_k=10,
-            relevance_threshold=0.5,
-            model_name="gemini-2.0-flash-001",
-            temperature=0.2
+        orchestrator = _build_orchestrator(
+            db_path, collection_name, project_id, credentials_path, "gemini-2.0-flash-001"
         )
         logger.info(f"Initialized RAG orchestrator with database {db_path}")
         return orchestrator
@@ -156,30 +219,128 @@ def display_chunks_sidebar():
         with st.sidebar:
             st.subheader(f"Retrieved Chunks for: '{st.session_state.last_query}'")
             
-            # Display each chunk in an expander
-            for i, chunk in enumerate(st.session_state.current_chunks):
-                # Get similarity score if available
-                similarity = chunk.get("similarity", 0.0)
-                
-                # Create expander with similarity score in title
-                with st.expander(f"Chunk {i+1} [similarity: {similarity:.4f}]"):
-                    metadata, content_info = format_chunk(chunk, i)
-                    
-                    # Display metadata and content as separate blocks
-                    st.markdown("### Metadata")
-                    st.json(metadata, expanded=False)
-                    
-                    st.markdown("### Content")
-                    st.markdown(content_info)
+            chunks = st.session_state.current_chunks
+            
+            # Select one chunk at a time, so only that chunk's metadata and content are
+            # rendered on each rerun instead of an expander body for every chunk
+            i = st.selectbox(
+                "Chunk",
+                options=range(len(chunks)),
+                # Show the similarity score if available
+                format_func=lambda i: f"Chunk {i+1} [similarity: {chunks[i].get('similarity', 0.0):.4f}]",
+                key="chunk_selector",
+                label_visibility="collapsed"
+            )
+            metadata, content_info = format_chunk(chunks[i], i)
+            
+            # Display metadata and content as separate blocks
+            st.markdown("### Metadata")
+            st.json(metadata, expanded=False)
+            
+            st.markdown("### Content")
+            st.markdown(content_info)
+
+@st.cache_resource(show_spinner=False)
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Start the event loop that runs the background processes, once per server process."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="background-processes", daemon=True).start()
+    return loop
+
+class BackgroundProcess:
+    """A command run on the background event loop, with its output collected as it arrives."""
+
+    def __init__(self, cmd: List[str], max_lines: int = 100):
+        """Start the command.
+
+        Args:
+            cmd: The command and its arguments.
+            max_lines: Number of most recent output lines to keep.
+        """
+        # A bounded deque drops the oldest line in O(1) as each new one arrives
+        self.output: Deque[str] = deque(maxlen=max_lines)
+        self.returncode: Optional[int] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        # "terminate" or "kill" when asked to stop before the process was started
+        self._pending_signal: Optional[str] = None
+        self._loop = _get_event_loop()
+        self._future = asyncio.run_coroutine_threadsafe(self._run_and_capture(cmd), self._loop)
+
+    async def _run_and_capture(self, cmd: List[str]) -> int:
+        # stderr is merged into stdout: the scripts log to stderr, and a single pipe
+        # cannot fill up unread while the other one is being drained
+        self._process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+        # Apply a cancellation that arrived while the process was being started
+        if self._pending_signal is not None:
+            self._signal(self._pending_signal)
+        # Read in large chunks rather than lines, so an overlong line cannot overrun the
+        # stream reader's line limit. The complete lines of each chunk are decoded and
+        # split in one call; a partial last line waits for the next chunk.
+        pending = b""
+        while chunk := await self._process.stdout.read(65536):
+            complete, _, pending = (pending + chunk).rpartition(b"\n")
+            self.output.extend(complete.decode(errors="replace").splitlines())
+        if pending:
+            self.output.extend(pending.decode(errors="replace").splitlines())
+        return await self._process.wait()
+
+    def poll(self) -> Optional[int]:
+        """Get the return code of the process, or None if it is still running."""
+        if self.returncode is None and self._future.done():
+            try:
+                self.returncode = self._future.result()
+            except Exception as e:
+                self.output.append(f"Error running process: {str(e)}")
+                self.returncode = -1
+        return self.returncode
+
+    def _signal(self, method: str):
+        # Runs on the event loop thread, like _run_and_capture, so it can't interleave with
+        # the process being started
+        if self._process is None:
+            self._pending_signal = method
+            return
+        try:
+            getattr(self._process, method)()
+        except ProcessLookupError:
+            # The process has already exited
+            pass
+
+    def terminate(self):
+        """Ask the process to terminate, as soon as it is started if it hasn't been yet."""
+        self._loop.call_soon_threadsafe(self._signal, "terminate")
+
+    def kill(self):
+        """Kill the process, as soon as it is started if it hasn't been yet."""
+        self._loop.call_soon_threadsafe(self._signal, "kill")
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """Wait for the process to finish.
+
+        Args:
+            timeout: Maximum number of seconds to wait.
 
-def update_database(db_name: str) -> subprocess.Popen:
+        Returns:
+            The return code of the process.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the process is still running after timeout seconds.
+        """
+        done, _ = concurrent.futures.wait([self._future], timeout)
+        if not done:
+            raise concurrent.futures.TimeoutError()
+        return self.poll()
+
+def update_database(db_name: str) -> Optional[BackgroundProcess]:
     """Update a database by running the update_repository.py script.
     
     Args:
         db_name: The name of the database to update (e.g., 'owner_repo').
         
     Returns:
-        The process object.
+        The background process.
     """
     try:
         # Extract repository name from database name
@@ -188,9 +349,10 @@ def update_database(db_name: str) -> subprocess.Popen:
         # Get GitHub token from environment
         github_token = os.environ.get("GITHUB_TOKEN", "")
         
-        # Construct the command
-        script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "utils", "update_repository.py")
-        cmd = ["python", script_path, repo_name]
+        # Construct the command, run with the app's own interpreter rather than whichever
+        # "python" comes first on PATH
+        script_path = os.path.join(_UTILS_DIR, "update_repository.py")
+        cmd = [sys.executable, script_path, repo_name]
         
         if github_token:
             cmd.extend(["--token", github_token])
@@ -199,37 +361,29 @@ def update_database(db_name: str) -> subprocess.Popen:
         logger.info(f"Running command: {' '.join(cmd)}")
         
         # Run the command as a separate process
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,  # Line buffered
-            universal_newlines=True,
-        )
-        
-        return process
+        return BackgroundProcess(cmd)
     except Exception as e:
         logger.error(f"Error running update script: {str(e)}")
         st.error(f"Error running update script: {str(e)}")
         return None
 
-def process_new_repository(repo_name: str) -> subprocess.Popen:
+def process_new_repository(repo_name: str) -> Optional[BackgroundProcess]:
     """Process a new GitHub repository.
     
     Args:
         repo_name: The name of the repository to process.
         
     Returns:
-        The process object.
+        The background process.
     """
     try:
         # Get GitHub token from environment
         github_token = os.environ.get("GITHUB_TOKEN", "")
         
-        # Construct the command
-        script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "utils", "process_repository.py")
-        cmd = ["python", script_path, repo_name]
+        # Construct the command, run with the app's own interpreter rather than whichever
+        # "python" comes first on PATH
+        script_path = os.path.join(_UTILS_DIR, "process_repository.py")
+        cmd = [sys.executable, script_path, repo_name]
         
         if github_token:
             cmd.extend(["--token", github_token])
@@ -238,292 +392,84 @@ def process_new_repository(repo_name: str) -> subprocess.Popen:
         logger.info(f"Running command: {' '.join(cmd)}")
         
         # Run the command as a separate process
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,  # Line buffered
-            universal_newlines=True,
-        )
-        
-        return process
+        return BackgroundProcess(cmd)
     except Exception as e:
         logger.error(f"Error running process script: {str(e)}")
         st.error(f"Error running process script: {str(e)}")
         return None
 
-def monitor_process_thread(process, process_type):
-    """Monitor a process in a separate thread.
-    
-    Args:
-        process: The process to monitor.
-        process_type: The type of process (e.g., "update", "add_repo").
-    """
-    # Create temp directory for process results
-    temp_dir = os.path.join(os.path.dirname(__file__), "temp")
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    # Initialize result file path
-    result_file = os.path.join(temp_dir, f"{process_type}_result.json")
-    
-    # Initialize output list
-    output_lines = []
-    
-    try:
-        # Read output line by line
-        for line in iter(process.stdout.readline, ""):
-            if not line:
-                break
-            
-            # Add line to output
-            output_lines.append(line.strip())
-            
-            # Update session state if this is running in the main thread
-            try:
-                if process_type == "update":
-                    if not hasattr(st.session_state, "update_output"):
-                        st.session_state.update_output = []
-                    st.session_state.update_output.append(line.strip())
-                elif process_type == "add_repo":
-                    if not hasattr(st.session_state, "add_repo_output"):
-                        st.session_state.add_repo_output = []
-                    st.session_state.add_repo_output.append(line.strip())
-            except Exception as e:
-                logger.error(f"Error updating session state: {str(e)}")
-        
-        # Read any remaining output
-        remaining_output, _ = process.communicate()
-        if remaining_output:
-            for line in remaining_output.splitlines():
-                line_str = line.strip() if isinstance(line, str) else line.decode().strip()
-                output_lines.append(line_str)
-                
-                # Update session state if this is running in the main thread
-                try:
-                    if process_type == "update":
-                        if not hasattr(st.session_state, "update_output"):
-                            st.session_state.update_output = []
-                        st.session_state.update_output.append(line_str)
-                    elif process_type == "add_repo":
-                        if not hasattr(st.session_state, "add_repo_output"):
-                            st.session_state.add_repo_output = []
-                        st.session_state.add_repo_output.append(line_str)
-                except Exception as e:
-                    logger.error(f"Error updating session state: {str(e)}")
-        
-        # Get return code
-        returncode = process.poll()
-        
-        # Write result to file
-        result = {
-            "completed": True,
-            "returncode": returncode,
-            "output": output_lines,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        with open(result_file, "w") as f:
-            json.dump(result, f)
-        
-    except Exception as e:
-        logger.error(f"Error monitoring process: {str(e)}")
-        
-        # Check if process was terminated
-        if process.poll() is not None and process.returncode in [-15, -9]:  # SIGTERM or SIGKILL
-            # Process was terminated or killed
-            result = {
-                "completed": True,
-                "returncode": process.returncode,
-                "output": output_lines + [f"Process was cancelled: {str(e)}"],
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        else:
-            # Other error
-            result = {
-                "completed": True,
-                "returncode": -1,
-                "output": output_lines + [f"Error monitoring process: {str(e)}"],
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        
-        with open(result_file, "w") as f:
-            json.dump(result, f)
-
-def check_background_processes():
-    """Check the status of background processes and update the UI accordingly."""
-    process_completed = False
-    
-    # Check add repository process
-    if st.session_state.add_repo_process is not None:
-        # Check if process is still running
-        if st.session_state.add_repo_process.poll() is None:
-            # Process is still running - just collect output without blocking
-            try:
-                # Read stdout without blocking
-                while True:
-                    line = st.session_state.add_repo_process.stdout.readline()
-                    if not line:
-                        break
-                    st.session_state.add_repo_output.append(line.strip())
-                    if len(st.session_state.add_repo_output) > 100:
-                        st.session_state.add_repo_output.pop(0)
-                
-                # Read stderr without blocking
-                while True:
-                    line = st.session_state.add_repo_process.stderr.readline()
-                    if not line:
-                        break
-                    st.session_state.add_repo_output.append(f"ERROR: {line.strip()}")
-                    if len(st.session_state.add_repo_output) > 100:
-                        st.session_state.add_repo_output.pop(0)
-            except:
-                pass
-        else:
-            # Process completed - collect final output
-            try:
-                stdout, stderr = st.session_state.add_repo_process.communicate(timeout=0.1)
-                
-                # Add final output
-                if stdout:
-                    for line in stdout.split('\n'):
-                        if line.strip():
-                            st.session_state.add_repo_output.append(line.strip())
-                
-                if stderr:
-                    for line in stderr.split('\n'):
-                        if line.strip():
-                            st.session_state.add_repo_output.append(f"ERROR: {line.strip()}")
-                
-                # Set timestamp
-                st.session_state.add_repo_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                if st.session_state.add_repo_process.returncode == 0:
-                    st.session_state.add_repo_status = "success"
-                    process_completed = True
-                    
-                    # Extract the repository name for the database name
-                    if "/" in st.session_state.add_repo_input:
-                        repo_input = st.session_state.add_repo_input
-                        # Extract the repo name from the URL or owner/repo format
-                        if "github.com" in repo_input:
-                            # It's a URL, extract owner/repo
-                            parts = repo_input.split("/")
-                            if len(parts) >= 2:
-                                repo_name = f"{parts[-2]}_{parts[-1]}"
-                        else:
-                            # It's already in owner/repo format
-                            repo_name = repo_input.replace("/", "_")
-                        
-                        # Refresh the database list
-                        available_dbs = get_available_databases()
-                        
-                        # If the newly added database is the currently selected one, reinitialize
-                        if repo_name == st.session_state.selected_db:
-                            force_refresh_orchestrator()
-                else:
-                    st.session_state.add_repo_status = "error"
-                    process_completed = True
-                
-                # Clear the process
-                st.session_state.add_repo_process = None
-            except subprocess.TimeoutExpired:
-                # This shouldn't happen since we're checking poll() first
-                pass
-    
-    # Similar logic for update process (if needed)
-    
-    # Return whether any process completed this check
-    return process_completed
-
 def check_process_completion():
-    """Check if any background processes have completed by looking for result files."""
-    temp_dir = os.path.join(os.path.dirname(__file__), "temp")
-    if not os.path.exists(temp_dir):
+    """Collect the output of the background processes and check whether any has completed."""
+    # Nothing to check on the reruns where no process is running
+    if st.session_state.add_repo_process is None and st.session_state.update_process is None:
         return False
-    
+
     process_completed = False
     
-    # Check for add_repo result file
-    add_repo_result_file = os.path.join(temp_dir, "add_repo_result.json")
-    if os.path.exists(add_repo_result_file):
-        try:
-            with open(add_repo_result_file, 'r') as f:
-                result = json.load(f)
+    # Check the add repository process
+    process = st.session_state.add_repo_process
+    if process is not None:
+        returncode = process.poll()
+        st.session_state.add_repo_output = list(process.output)
+        
+        if returncode is not None:
+            # Update session state
+            if returncode in [-15, -9]:  # SIGTERM or SIGKILL
+                st.session_state.add_repo_status = "cancelled"
+            else:
+                st.session_state.add_repo_status = "success" if returncode == 0 else "error"
             
-            if result.get("completed", False):
-                # Update session state
-                if result["returncode"] in [-15, -9]:  # SIGTERM or SIGKILL
-                    st.session_state.add_repo_status = "cancelled"
+            st.session_state.add_repo_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            st.session_state.add_repo_process = None
+            
+            # A new database directory may exist now
+            if st.session_state.add_repo_status == "success":
+                _list_databases.clear()
+
+            # If successful, check if we need to refresh the orchestrator
+            if st.session_state.add_repo_status == "success" and "/" in st.session_state.add_repo_input:
+                repo_input = st.session_state.add_repo_input
+                # Extract the repo name from the URL or owner/repo format
+                if "github.com" in repo_input:
+                    # It's a URL, extract owner/repo
+                    parts = repo_input.split("/")
+                    if len(parts) >= 2:
+                        repo_name = f"{parts[-2]}_{parts[-1]}"
                 else:
-                    st.session_state.add_repo_status = "success" if result["returncode"] == 0 else "error"
-                
-                st.session_state.add_repo_output = result["output"]
-                st.session_state.add_repo_timestamp = result["timestamp"]
-                st.session_state.add_repo_process = None
-                
-                # If successful, check if we need to refresh the orchestrator
-                if st.session_state.add_repo_status == "success" and "/" in st.session_state.add_repo_input:
-                    repo_input = st.session_state.add_repo_input
-                    # Extract the repo name from the URL or owner/repo format
-                    if "github.com" in repo_input:
-                        # It's a URL, extract owner/repo
-                        parts = repo_input.split("/")
-                        if len(parts) >= 2:
-                            repo_name = f"{parts[-2]}_{parts[-1]}"
-                    else:
-                        # It's already in owner/repo format
-                        repo_name = repo_input.replace("/", "_")
-                    
-                    # If the newly added database is the currently selected one, reinitialize
-                    if repo_name == st.session_state.selected_db:
-                        force_refresh_orchestrator()
+                    # It's already in owner/repo format
+                    repo_name = repo_input.replace("/", "_")
                 
-                # Remove the result file
-                os.remove(add_repo_result_file)
-                process_completed = True
-        except Exception as e:
-            logger.error(f"Error reading result file: {str(e)}")
-            # Remove the result file if it's corrupted
-            try:
-                os.remove(add_repo_result_file)
-            except:
-                pass
+                # If the newly added database is the currently selected one, reinitialize
+                if repo_name == st.session_state.selected_db:
+                    force_refresh_orchestrator()
+            
+            process_completed = True
     
-    # Check for update result file
-    update_result_file = os.path.join(temp_dir, "update_result.json")
-    if os.path.exists(update_result_file):
-        try:
-            with open(update_result_file, 'r') as f:
-                result = json.load(f)
+    # Check the update process
+    process = st.session_state.update_process
+    if process is not None:
+        returncode = process.poll()
+        st.session_state.update_output = list(process.output)
+        
+        if returncode is not None:
+            # Update session state
+            if returncode in [-15, -9]:  # SIGTERM or SIGKILL
+                st.session_state.update_status = "cancelled"
+            else:
+                st.session_state.update_status = "success" if returncode == 0 else "error"
             
-            if result.get("completed", False):
-                # Update session state
-                if result["returncode"] in [-15, -9]:  # SIGTERM or SIGKILL
-                    st.session_state.update_status = "cancelled"
-                else:
-                    st.session_state.update_status = "success" if result["returncode"] == 0 else "error"
-                
-                st.session_state.update_output = result["output"]
-                st.session_state.update_timestamp = result["timestamp"]
-                st.session_state.update_process = None
-                
-                # If successful, refresh the orchestrator if this is the currently selected database
-                if st.session_state.update_status == "success":
-                    # If the updated database is the currently selected one, reinitialize
-                    if st.session_state.update_db == st.session_state.selected_db:
-                        force_refresh_orchestrator()
-                
-                # Remove the result file
-                os.remove(update_result_file)
-                process_completed = True
-        except Exception as e:
-            logger.error(f"Error reading result file: {str(e)}")
-            # Remove the result file if it's corrupted
-            try:
-                os.remove(update_result_file)
-            except:
-                pass
+            st.session_state.update_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            st.session_state.update_process = None
+            
+            # If successful, refresh the orchestrator if this is the currently selected database
+            if st.session_state.update_status == "success":
+                _list_databases.clear()
+
+                # If the updated database is the currently selected one, reinitialize
+                if st.session_state.update_db == st.session_state.selected_db:
+                    force_refresh_orchestrator()
+            
+            process_completed = True
     
     return process_completed
 
@@ -546,10 +492,10 @@ def cancel_process(process):
         # Wait a short time for it to terminate
         try:
             process.wait(timeout=2)
-        except subprocess.TimeoutExpired:
-            # If it doesn't terminate, kill it
+        except concurrent.futures.TimeoutError:
+            # If it doesn't terminate, kill it; never block the script indefinitely
             process.kill()
-            process.wait()
+            process.wait(timeout=5)
         
         return True
     except Exception as e:
@@ -558,6 +504,8 @@ def cancel_process(process):
 
 def force_refresh_orchestrator():
     """Force refresh the RAG orchestrator."""
+    # Drop the cached orchestrators so the database is reopened
+    _build_orchestrator.clear()
     st.session_state.orchestrator = initialize_rag_orchestrator()
     logger.info("RAG orchestrator forcefully reinitialized.")
 
@@ -600,8 +548,7 @@ def main():
         st.session_state.add_repo_process = None
     if "add_repo_status" not in st.session_state:
         st.session_state.add_repo_status = None
-    if "add_repo_output" not in st.session_state:
-        st.session_state.add_repo_output = []
+    st.session_state.setdefault("add_repo_output", [])
     if "add_repo_input" not in st.session_state:
         st.session_state.add_repo_input = ""
     if "add_repo_timestamp" not in st.session_state:
@@ -612,17 +559,15 @@ def main():
         st.session_state.update_process = None
     if "update_status" not in st.session_state:
         st.session_state.update_status = None
-    if "update_output" not in st.session_state:
-        st.session_state.update_output = []
+    st.session_state.setdefault("update_output", [])
     if "update_db" not in st.session_state:
         st.session_state.update_db = None
     if "update_timestamp" not in st.session_state:
         st.session_state.update_timestamp = None
     
-    # Check if any background processes have completed
-    process_completed = check_process_completion()
-    if process_completed:
-        st.rerun()
+    # Check if any background processes have completed. This runs before anything is
+    # rendered, so the rest of this run already shows the new status without a rerun.
+    check_process_completion()
     
     # Initialize RAG orchestrator if not already initialized
     if st.session_state.orchestrator is None:
@@ -645,7 +590,6 @@ def main():
                 "generation_time": 0.0,
                 "total_time": 0.0
             }
-            st.rerun()
         
         # Add a separator
         st.divider()
@@ -665,10 +609,9 @@ def main():
                 label_visibility="collapsed"
             )
             
-            # Check if toggle state changed
-            if show_db_settings != st.session_state.show_db_settings:
-                st.session_state.show_db_settings = show_db_settings
-                st.rerun()
+            # The sections below are rendered after the toggle, so they pick up its new value
+            # in this same run
+            st.session_state.show_db_settings = show_db_settings
         
         # Show database settings if enabled
         if st.session_state.show_db_settings:
@@ -691,7 +634,6 @@ def main():
                 st.session_state.selected_db = selected_db
                 st.session_state.orchestrator = initialize_rag_orchestrator()
                 st.session_state.messages = []
-                st.rerun()
             
             # Display collection count
             if st.session_state.orchestrator:
@@ -706,7 +648,6 @@ def main():
             if st.button("Force Refresh Database Connection"):
                 force_refresh_orchestrator()
                 st.success("Database connection refreshed!")
-                st.rerun()
             
             # Update Database section
             with st.expander("Update Database"):
@@ -730,7 +671,6 @@ def main():
                         st.session_state.update_status = None
                         st.session_state.update_output = []
                         st.session_state.update_process = None
-                        st.rerun()
                     
                     if st.session_state.update_process is None or st.session_state.update_status != "running":
                         # Start the update process
@@ -743,9 +683,6 @@ def main():
                             st.session_state.update_db = update_db
                             st.session_state.update_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                             
-                            # Start a thread to monitor the process
-                            threading.Thread(target=monitor_process_thread, args=(process, "update")).start()
-                            
                             # Force a rerun to show the cancel button immediately
                             st.rerun()
                 
@@ -815,7 +752,6 @@ def main():
                         st.session_state.add_repo_status = None
                         st.session_state.add_repo_output = []
                         st.session_state.add_repo_process = None
-                        st.rerun()
                 
                 # Process status and output
                 if add_clicked and repo_input:
@@ -833,9 +769,6 @@ def main():
                             st.session_state.add_repo_input = repo_input
                             st.session_state.add_repo_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                             
-                            # Start a thread to monitor the process
-                            threading.Thread(target=monitor_process_thread, args=(process, "add_repo")).start()
-                            
                             # Force a rerun to show the cancel button immediately
                             st.rerun()
                 
@@ -905,10 +838,9 @@ def main():
                 label_visibility="collapsed"
             )
             
-            # Check if toggle state changed
-            if show_timing != st.session_state.show_timing:
-                st.session_state.show_timing = show_timing
-                st.rerun()
+            # The sections below are rendered after the toggle, so they pick up its new value
+            # in this same run
+            st.session_state.show_timing = show_timing
         
         # Display timing information if enabled
         if st.session_state.show_timing and st.session_state.timing_info["total_time"] > 0:
@@ -942,10 +874,9 @@ def main():
                 label_visibility="collapsed"
             )
             
-            # Check if toggle state changed
-            if show_chunks != st.session_state.show_chunks:
-                st.session_state.show_chunks = show_chunks
-                st.rerun()
+            # The sections below are rendered after the toggle, so they pick up its new value
+            # in this same run
+            st.session_state.show_chunks = show_chunks
     
     # Display chunks in sidebar
     display_chunks_sidebar()
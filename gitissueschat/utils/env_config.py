@@ -0,0 +1,42 @@
+"""
+Environment Configuration
+
+This module provides a utility function for reading the credentials used by the scripts
+from the environment once, after loading any .env file.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class EnvConfig:
+    """Credentials and project settings read from the environment."""
+
+    github_token: Optional[str]
+    project_id: Optional[str]
+    api_key: Optional[str]
+    credentials_path: Optional[str]
+
+
+def load_env(dotenv_path: Optional[str] = None) -> EnvConfig:
+    """
+    Load environment variables from a .env file and read the script settings.
+
+    Args:
+        dotenv_path: Optional path to the .env file. If None, searches for a .env file.
+
+    Returns:
+        The settings read from the environment.
+    """
+    load_dotenv(dotenv_path)
+
+    return EnvConfig(
+        github_token=os.environ.get("GITHUB_TOKEN"),
+        project_id=os.environ.get("GOOGLE_PROJECT_ID") or os.environ.get("GOOGLE_CLOUD_PROJECT"),
+        api_key=os.environ.get("GOOGLE_API_KEY"),
+        credentials_path=os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    )
@@ -16,7 +16,7 @@ import argparse
 import logging
 import time
 import re
-from typing import Optional
+from typing import List, Optional
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 
@@ -29,6 +29,10 @@ from gitissueschat.utils.db_path_manager import get_sqlite_db_path, get_chroma_d
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Inputs already in the plain 'owner/repo' form, which need no normalization
+_FAST_ACCEPT = re.compile(r'^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$').match
+_OWNER_REPO = re.compile(r'^[^/]+/[^/]+$').match
+
 def extract_repo_from_url(url: str) -> str:
     """
     Extract the repository name from a GitHub URL.
@@ -77,6 +81,10 @@ def normalize_repo_input(repo_input: str) -> str:
     Raises:
         ValueError: If the input is not a valid GitHub repository URL or name.
     """
+    # Fast path for the common case of an already normalized name
+    if _FAST_ACCEPT(repo_input) and not repo_input.endswith('.git'):
+        return repo_input
+    
     # Check if it's a URL
     if repo_input.startswith('http'):
         return extract_repo_from_url(repo_input)
@@ -86,11 +94,34 @@ def normalize_repo_input(repo_input: str) -> str:
         repo_input = repo_input[:-4]
     
     # Check if it's in the format 'owner/repo'
-    if re.match(r'^[^/]+/[^/]+$', repo_input):
+    if _OWNER_REPO(repo_input):
         return repo_input
     
     raise ValueError(f"Invalid repository format: {repo_input}. Expected a GitHub URL or 'owner/repo' format.")
 
+def normalize_repo_input_batch(repo_inputs: List[str]) -> List[Optional[str]]:
+    """
+    Normalize many repository inputs at once.
+    
+    Each distinct input is normalized only once, and invalid inputs map to None
+    instead of aborting the whole batch.
+    
+    Args:
+        repo_inputs: Repository inputs, each either a URL or a name in the format 'owner/repo'.
+        
+    Returns:
+        Repository names in the format 'owner/repo' (None for invalid inputs), in input order.
+    """
+    normalized = {}
+    for repo_input in repo_inputs:
+        if repo_input not in normalized:
+            try:
+                normalized[repo_input] = normalize_repo_input(repo_input)
+            except ValueError:
+                normalized[repo_input] = None
+    
+    return [normalized[repo_input] for repo_input in repo_inputs]
+
 def download_issues(repo_name: str, github_token: str, db_path: str, resume: bool = True) -> None:
     """
     Download issues from a GitHub repository and store them in an SQLite database.
@@ -113,8 +144,9 @@ def download_issues(repo_name: str, github_token: str, db_path: str, resume: boo
     storage.create_tables()
     
     # Get existing issue numbers
-    existing_issue_numbers = set(storage.get_issue_numbers(repo_name))
-    logger.info(f"Found {len(existing_issue_numbers)} existing issues in the database")
+    existing_issue_numbers = storage.get_issue_number_set(repo_name)
+    issues_before_count = len(existing_issue_numbers)
+    logger.info(f"Found {issues_before_count} existing issues in the database")
     
     # If we have existing issues and we're not explicitly asking to resume, skip downloading
     if existing_issue_numbers and not resume:
@@ -178,7 +210,7 @@ def download_issues(repo_name: str, github_token: str, db_path: str, resume: boo
         new_issues_count=total_new,
         updated_issues_count=total_updated,
         redundant_issues_count=total_redundant,
-        issues_before_count=storage.get_issue_count(repo_name),
+        issues_before_count=issues_before_count,
         issues_after_count=storage.get_issue_count(repo_name),
         api_rate_limit_remaining=remaining,
         api_rate_limit_total=limit,
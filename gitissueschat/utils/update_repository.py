@@ -61,6 +61,15 @@ def delete_issue_chunks_from_chromadb(
         chroma_db: ChromaDB instance.
         issue_id: Issue ID to delete.
     """
+    try:
+        # Let ChromaDB match the chunks itself instead of fetching their IDs first
+        chroma_db.collection.delete(where={"issue_id": issue_id})
+        logger.info(f"Deleted chunks for issue ID {issue_id} from ChromaDB")
+        return
+    except TypeError:
+        # ChromaDB version without delete-by-metadata
+        pass
+    
     # Get all chunks for this issue
     results = chroma_db.collection.get(where={"issue_id": issue_id})
     
@@ -142,7 +151,7 @@ def update_repository(
     fetcher = GitHubIssuesFetcher(github_token)
     
     # Get existing issue numbers
-    existing_issue_numbers = set(storage.get_issue_numbers(repo_name))
+    existing_issue_numbers = storage.get_issue_number_set(repo_name)
     existing_issue_codes = storage.get_issue_codes(repo_name)
     
     # Track statistics